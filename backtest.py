@@ -0,0 +1,195 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from indicators import prefix_sums, rolling_mean, rolling_rsi, rolling_std
+from screener import Rule
+
+# Trading sessions per year, used to annualize returns and volatility
+PERIODS_PER_YEAR = 252
+
+# Function to turn entry/exit masks into a long/flat position panel (1 = long) without a per-bar loop
+def positions_from_signals(entries, exits):
+    entries = np.asarray(entries, dtype=bool)
+    exits = np.asarray(exits, dtype=bool)
+    rows = np.arange(len(entries))[:, None]
+    # The position on each bar is whichever event happened last; an exit on the same bar wins
+    last_entry = np.maximum.accumulate(np.where(entries & ~exits, rows, -1), axis=0)
+    last_exit = np.maximum.accumulate(np.where(exits, rows, -1), axis=0)
+    return (last_entry > last_exit).astype(float)
+
+# Function to list every completed or still-open trade in a position panel; a trade still open at the end
+# is priced at its ticker's last valid close
+def trade_list(positions, close, index, columns, cost=0.0):
+    n_rows = len(positions)
+    padded = np.zeros((n_rows + 2, positions.shape[1]))
+    padded[1:-1] = positions
+    changes = np.diff(padded, axis=0)
+    # Transposed so trades come out grouped by ticker and in time order within each ticker
+    entry_cols, entry_rows = np.nonzero(changes.T > 0)
+    exit_cols, exit_rows = np.nonzero(changes.T < 0)
+    still_open = exit_rows == n_rows
+    exit_rows = np.minimum(exit_rows, n_rows - 1)
+    rows = np.arange(n_rows)[:, None]
+    last_valid = np.maximum.accumulate(np.where(np.isnan(close), 0, rows), axis=0)
+    exit_rows = np.where(still_open, last_valid[exit_rows, exit_cols], exit_rows)
+    entry_price = close[entry_rows, entry_cols]
+    exit_price = close[exit_rows, exit_cols]
+    return pd.DataFrame({
+        'Ticker': np.asarray(columns)[entry_cols],
+        'Entry Date': np.asarray(index)[entry_rows],
+        'Exit Date': np.asarray(index)[exit_rows],
+        'Entry Price': entry_price,
+        'Exit Price': exit_price,
+        'Bars': exit_rows - entry_rows,
+        'Return': exit_price / entry_price * (1 - cost) ** 2 - 1,
+        'Open': still_open,
+    })
+
+# Function to summarize equity curves per ticker: total/annual return, volatility, Sharpe, drawdown.
+# Annualizing and exposure count only the bars a ticker was listed, not every row of the panel
+def summarize(strategy_returns, equity, drawdown, positions, listed):
+    periods = np.maximum(listed.sum(axis=0), 1)
+    total = equity[-1] - 1
+    with np.errstate(invalid='ignore', divide='ignore'):
+        annual = (1 + total) ** (PERIODS_PER_YEAR / periods) - 1
+        volatility = strategy_returns.std(axis=0) * np.sqrt(PERIODS_PER_YEAR)
+        sharpe = strategy_returns.mean(axis=0) / strategy_returns.std(axis=0) * np.sqrt(PERIODS_PER_YEAR)
+    entries = (np.diff(positions, axis=0, prepend=0.0) > 0).sum(axis=0)
+    return {
+        'Total Return': total,
+        'Annual Return': annual,
+        'Volatility': volatility,
+        'Sharpe': np.nan_to_num(sharpe),
+        'Max Drawdown': drawdown.min(axis=0),
+        'Exposure': positions.sum(axis=0) / periods,
+        'Trades': entries,
+    }
+
+# Function to backtest entry/exit masks over a (dates x tickers) close panel.
+# A signal on a bar's close is filled at that close, so the position earns from the next bar on;
+# `cost` is the fraction of value paid on every entry and every exit.
+def run_backtest(close, entries, exits, cost=0.0, trades=True):
+    frame = close if isinstance(close, pd.DataFrame) else None
+    prices = np.asarray(close, dtype=float)
+    if prices.ndim == 1:
+        prices = prices[:, None]
+    listed = ~np.isnan(prices)
+    entries = np.asarray(entries, dtype=bool).reshape(prices.shape) & listed
+    exits = np.asarray(exits, dtype=bool).reshape(prices.shape)
+    # A ticker whose prices stop (delisted, suspended) is sold at its last listed close
+    exits = exits.copy()
+    exits[:-1] |= listed[:-1] & ~listed[1:]
+    positions = positions_from_signals(entries, exits)
+
+    asset_returns = np.zeros(prices.shape)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        asset_returns[1:] = prices[1:] / prices[:-1] - 1
+    asset_returns[~np.isfinite(asset_returns)] = 0.0
+    held = np.zeros(prices.shape)
+    held[1:] = positions[:-1]
+    turnover = np.abs(np.diff(positions, axis=0, prepend=0.0))
+    strategy_returns = held * asset_returns - turnover * cost
+
+    equity = np.cumprod(1 + strategy_returns, axis=0)
+    drawdown = equity / np.maximum.accumulate(equity, axis=0) - 1
+
+    result = {
+        'positions': positions,
+        'returns': strategy_returns,
+        'equity': equity,
+        'drawdown': drawdown,
+    }
+    index = frame.index if frame is not None else np.arange(len(prices))
+    columns = frame.columns if frame is not None else np.arange(prices.shape[1])
+    summary = pd.DataFrame(summarize(strategy_returns, equity, drawdown, positions, listed), index=columns)
+    summary.index.name = 'Ticker'
+    if frame is not None:
+        result = {name: pd.DataFrame(array, index=index, columns=columns, copy=False) for name, array in result.items()}
+    result['summary'] = summary
+    if trades:
+        result['trades'] = trade_list(positions, prices, index, columns, cost)
+    return result
+
+# Function to build entry/exit masks from two screener rules evaluated over {column: panel}
+def signals_from_rules(panels, entry_rule, exit_rule):
+    entry_rule, exit_rule = Rule(entry_rule), Rule(exit_rule)
+    values = {name: np.asarray(panel, dtype=float) for name, panel in panels.items()}
+    return entry_rule.mask(values), exit_rule.mask(values)
+
+# Strategy: hold while the fast SMA is above the slow SMA (enter on the cross up, exit on the cross down)
+def sma_crossover(close, fast=20, slow=50):
+    prefix = prefix_sums(close)
+    fast_sma, slow_sma = rolling_mean(prefix, fast), rolling_mean(prefix, slow)
+    return fast_sma > slow_sma, fast_sma < slow_sma
+
+# Strategy: buy when RSI falls below `lower`, sell when it rises above `upper`
+def rsi_threshold(close, lower=30, upper=70, period=14):
+    rsi = rolling_rsi(close, period)
+    return rsi < lower, rsi > upper
+
+# Strategy: buy a close above the upper Bollinger band, exit on a close below the middle band
+def bollinger_breakout(close, window=20, width=2.0):
+    prefix = prefix_sums(close, with_squares=True)
+    middle = rolling_mean(prefix, window)
+    upper = middle + width * rolling_std(prefix, window)
+    with np.errstate(invalid='ignore'):
+        return close > upper, close < middle
+
+STRATEGIES = {
+    'sma_crossover': sma_crossover,
+    'rsi_threshold': rsi_threshold,
+    'bollinger_breakout': bollinger_breakout,
+}
+
+# Close panel for sweep workers; sent once per process instead of with every task
+sweep_close = None
+
+# Function to install the close panel in a sweep worker process
+def init_sweep_worker(close):
+    global sweep_close
+    sweep_close = close
+
+# Function to backtest one parameter combination and reduce it to cross-ticker averages
+def run_sweep_task(task):
+    strategy, params, cost = task
+    entries, exits = STRATEGIES[strategy](sweep_close, **params)
+    summary = run_backtest(sweep_close, entries, exits, cost=cost, trades=False)['summary']
+    row = dict(params)
+    row.update({
+        'Mean Return': summary['Total Return'].mean(),
+        'Median Return': summary['Total Return'].median(),
+        'Mean Sharpe': summary['Sharpe'].mean(),
+        'Worst Drawdown': summary['Max Drawdown'].min(),
+        'Mean Drawdown': summary['Max Drawdown'].mean(),
+        'Trades': int(summary['Trades'].sum()),
+    })
+    return row
+
+# Function to expand {'fast': [5, 10], 'slow': [50, 100]} into a list of parameter dicts
+def parameter_grid(grid):
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+# Function to backtest every parameter combination of a strategy across processes, best Sharpe first
+def sweep(close, strategy, grid, cost=0.0, processes=None, chunksize=None):
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'. Choose from: {', '.join(STRATEGIES)}")
+    prices = np.asarray(close, dtype=float)
+    if prices.ndim == 1:
+        prices = prices[:, None]
+    tasks = [(strategy, params, cost) for params in parameter_grid(grid)]
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(tasks) == 1:
+        init_sweep_worker(prices)
+        rows = [run_sweep_task(task) for task in tasks]
+    else:
+        chunksize = chunksize or max(1, len(tasks) // (processes * 4))
+        with ProcessPoolExecutor(max_workers=processes, initializer=init_sweep_worker,
+                                 initargs=(prices,)) as pool:
+            rows = list(pool.map(run_sweep_task, tasks, chunksize=chunksize))
+    results = pd.DataFrame(rows)
+    return results.sort_values('Mean Sharpe', ascending=False, kind='stable').reset_index(drop=True)
@@ -0,0 +1,66 @@
+# Timing comparison of serial and batched market data downloads.
+#
+# Record a fixture once from yfinance:
+#     python -m benchmarks.batchfetch --record fixture.parquet --symbols symbols.csv
+# Replay it offline (each download call pays the simulated round trip):
+#     python -m benchmarks.batchfetch --fixture fixture.parquet
+# Without --fixture the LocalProvider synthesizes --count random-walk symbols instead.
+import argparse
+import time
+
+import pandas as pd
+
+from marketdata import fetch_market_data_batch, normalize_ticker
+from marketprovider import LocalProvider, YFinanceProvider, save_fixture
+
+# Function to fetch every symbol with one download call each, like the old Analyze loop
+def fetch_serial(tickers, start_date, end_date, provider):
+    market_data = {}
+    for ticker in tickers:
+        symbol = normalize_ticker(ticker)
+        stock_data = provider.download([symbol], start=start_date, end=end_date).get(symbol)
+        if stock_data is not None and not stock_data.empty:
+            market_data[ticker] = stock_data
+    return market_data
+
+def main():
+    parser = argparse.ArgumentParser(description="Serial vs batched market data fetch")
+    parser.add_argument('--fixture', help="Parquet fixture to replay")
+    parser.add_argument('--record', help="Record a fixture from yfinance to this path and exit")
+    parser.add_argument('--symbols', help="CSV with a StockSymbol column (used with --record)")
+    parser.add_argument('--start', default='2023-01-01')
+    parser.add_argument('--end', default='2024-01-01')
+    parser.add_argument('--count', type=int, default=100, help="Synthetic symbol count")
+    parser.add_argument('--latency', type=float, default=0.2, help="Simulated seconds per request")
+    args = parser.parse_args()
+
+    if args.record:
+        symbols = [normalize_ticker(s) for s in pd.read_csv(args.symbols)['StockSymbol'].dropna()]
+        frames = YFinanceProvider().download(symbols, start=args.start, end=args.end)
+        save_fixture(frames, args.record)
+        print(f"Recorded {len(frames)} of {len(symbols)} symbols to {args.record}")
+        return
+
+    if args.fixture:
+        tickers = sorted(pd.read_parquet(args.fixture, columns=['Ticker'])['Ticker'].unique())
+    else:
+        tickers = [f"SYM{i:04d}.NS" for i in range(args.count)]
+
+    results = []
+    for name in ['serial', 'batched']:
+        provider = LocalProvider(args.fixture, latency=args.latency, per_symbol_latency=0.002)
+        started = time.perf_counter()
+        if name == 'serial':
+            market_data = fetch_serial(tickers, args.start, args.end, provider)
+        else:
+            market_data, failed = fetch_market_data_batch(tickers, args.start, args.end, provider=provider, cache_dir=None)
+        elapsed = time.perf_counter() - started
+        results.append((name, len(market_data), provider.calls, elapsed))
+
+    print(f"{'mode':<10}{'symbols':>10}{'requests':>10}{'seconds':>10}")
+    for name, count, calls, elapsed in results:
+        print(f"{name:<10}{count:>10}{calls:>10}{elapsed:>10.2f}")
+    print(f"speedup: {results[0][3] / results[1][3]:.1f}x")
+
+if __name__ == '__main__':
+    main()
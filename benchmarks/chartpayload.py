@@ -0,0 +1,62 @@
+# Figure JSON payload of the stock charts with and without server-side downsampling.
+#
+#     python -m benchmarks.chartpayload --years 20 --tickers 24
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from downsample import MAX_POINTS
+from indicators import calculate_technical_indicators
+from marketdata import add_simulated_depth
+from pathkernels import calculate_path_indicators
+from stockcharts import plot_bid_offer_volumes, plot_daily_trend_with_indicators, plot_macd, plot_rsi
+
+# Function to build one ticker's daily OHLCV frame with every indicator the apps chart
+def synthetic_market_frame(years, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end='2024-12-31', periods=years * 252)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))
+    data = pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.005, len(dates))),
+        'High': close * (1 + np.abs(rng.normal(0, 0.01, len(dates)))),
+        'Low': close * (1 - np.abs(rng.normal(0, 0.01, len(dates)))),
+        'Close': close,
+        'Volume': rng.integers(10000, 1000000, len(dates)),
+    }, index=dates)
+    data = add_simulated_depth(data)
+    data = calculate_technical_indicators(data)
+    return calculate_path_indicators(data)
+
+# Function to build the four time-series charts and return (JSON bytes, seconds)
+def chart_payload(data, max_points):
+    started = time.perf_counter()
+    figures = [
+        plot_daily_trend_with_indicators(data, 'SYN', max_points=max_points),
+        plot_macd(data, max_points=max_points),
+        plot_rsi(data, max_points=max_points),
+        plot_bid_offer_volumes(data, max_points=max_points),
+    ]
+    size = sum(len(figure.to_json()) for figure in figures)
+    return size, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description="Chart payload before/after downsampling")
+    parser.add_argument('--years', type=int, default=20)
+    parser.add_argument('--tickers', type=int, default=24)
+    parser.add_argument('--max-points', type=int, default=None, help="Override the downsampling target")
+    args = parser.parse_args()
+
+    data = synthetic_market_frame(args.years)
+    full_size, full_seconds = chart_payload(data, None)
+    small_size, small_seconds = chart_payload(data, args.max_points or MAX_POINTS)
+
+    print(f"{len(data)} bars per ticker, {args.tickers} tickers")
+    print(f"{'':<14}{'per ticker':>14}{'page':>14}{'build s':>10}")
+    print(f"{'full':<14}{full_size / 1e6:>12.2f}MB{full_size * args.tickers / 1e6:>12.2f}MB{full_seconds:>10.2f}")
+    print(f"{'downsampled':<14}{small_size / 1e6:>12.2f}MB{small_size * args.tickers / 1e6:>12.2f}MB{small_seconds:>10.2f}")
+    print(f"reduction: {full_size / small_size:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# Memory held by the per-ticker frames the stock apps build, float64 vs the compact layout.
+#
+#     python -m benchmarks.compactstorage --tickers 2000 --years 10
+import argparse
+import time
+
+from compact import compact_frame, market_data_memory
+from indicators import attach_indicators
+from marketdata import fetch_market_data_batch
+from marketprovider import LocalProvider
+from pathkernels import calculate_path_indicators
+
+END_DATE = '2024-12-31'
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact frame storage benchmark")
+    parser.add_argument('--tickers', type=int, default=2000)
+    parser.add_argument('--years', type=int, default=10)
+    args = parser.parse_args()
+
+    provider = LocalProvider(end_date=END_DATE)
+    start = f"{int(END_DATE[:4]) - args.years + 1}-01-01"
+    tickers = [f"SYM{i:04d}" for i in range(args.tickers)]
+    market_data, _ = fetch_market_data_batch(tickers, start, END_DATE, provider=provider, cache_dir=None)
+    provider.generated.clear()
+    market_data = attach_indicators(market_data)
+    for data in market_data.values():
+        calculate_path_indicators(data)
+        # What the day-of-week charts used to leave behind on every frame
+        data['DayOfWeek'] = data.index.day_name()
+    before = market_data_memory(market_data)
+
+    started = time.perf_counter()
+    for ticker in list(market_data):
+        market_data[ticker] = compact_frame(market_data[ticker])
+    seconds = time.perf_counter() - started
+    after = market_data_memory(market_data)
+
+    rows = sum(len(data) for data in market_data.values())
+    print(f"frames: {len(market_data)} tickers, {rows} rows, {len(next(iter(market_data.values())).columns)} columns")
+    print(f"float64 + day names: {before / 1e6:10.1f} MB")
+    print(f"compact float32:     {after / 1e6:10.1f} MB")
+    print(f"reduction:           {1 - after / before:10.1%} ({before / after:.1f}x smaller)")
+    print(f"compaction time:     {seconds:10.2f}s")
+
+if __name__ == '__main__':
+    main()
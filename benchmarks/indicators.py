@@ -0,0 +1,95 @@
+# Panel indicator engine vs looping the per-ticker pandas implementation.
+#
+#     python -m benchmarks.indicators --tickers 2000 --years 10
+#     python -m benchmarks.indicators --tickers 5000 --years 5 --skip-legacy --processes 1 2 4 8
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from indicators import INDICATOR_COLUMNS, compute_indicator_panel, compute_indicator_panel_parallel
+
+# The per-ticker implementation the stock apps used to copy, kept here as the baseline
+def legacy_calculate_technical_indicators(data):
+    data['SMA_20'] = data['Close'].rolling(window=20).mean()
+    data['SMA_50'] = data['Close'].rolling(window=50).mean()
+    data['EMA_20'] = data['Close'].ewm(span=20, adjust=False).mean()
+    data['EMA_12'] = data['Close'].ewm(span=12, adjust=False).mean()
+    data['EMA_26'] = data['Close'].ewm(span=26, adjust=False).mean()
+    data['MACD'] = data['EMA_12'] - data['EMA_26']
+    data['Signal_Line'] = data['MACD'].ewm(span=9, adjust=False).mean()
+    data['BB_Middle'] = data['Close'].rolling(window=20).mean()
+    data['BB_Upper'] = data['BB_Middle'] + 2 * data['Close'].rolling(window=20).std()
+    data['BB_Lower'] = data['BB_Middle'] - 2 * data['Close'].rolling(window=20).std()
+    delta = data['Close'].diff()
+    gain = (delta.where(delta > 0, 0)).fillna(0)
+    loss = (-delta.where(delta < 0, 0)).fillna(0)
+    avg_gain = gain.rolling(window=14).mean()
+    avg_loss = loss.rolling(window=14).mean()
+    rs = avg_gain / avg_loss
+    data['RSI'] = 100 - (100 / (1 + rs))
+    return data
+
+# Function to build a random-walk close panel, with some tickers listing part way through
+def synthetic_close_panel(n_tickers, n_days, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2000-01-03', periods=n_days)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_days, n_tickers)), axis=0))
+    listed = rng.integers(0, n_days // 4, n_tickers) * (rng.random(n_tickers) < 0.1)
+    close[np.arange(n_days)[:, None] < listed] = np.nan
+    return pd.DataFrame(close, index=dates, columns=[f"SYM{i:04d}" for i in range(n_tickers)])
+
+# Function to time the per-ticker pandas baseline and check the panel engine against it
+def compare_legacy(close, panel, panel_seconds):
+    started = time.perf_counter()
+    legacy = {ticker: legacy_calculate_technical_indicators(close[[ticker]].dropna().rename(columns={ticker: 'Close'}))
+              for ticker in close.columns}
+    legacy_seconds = time.perf_counter() - started
+
+    worst = 0.0
+    for name in INDICATOR_COLUMNS:
+        expected = pd.concat({t: frame[name] for t, frame in legacy.items()}, axis=1).reindex(close.index)
+        diff = (panel[name] - expected).abs().to_numpy()
+        scale = np.maximum(expected.abs().to_numpy(), 1.0)
+        assert np.array_equal(np.isnan(panel[name].to_numpy()), np.isnan(expected.to_numpy())), name
+        worst = max(worst, np.nanmax(diff / scale))
+
+    print(f"looped per-ticker: {legacy_seconds:8.2f}s")
+    print(f"speedup:           {legacy_seconds / panel_seconds:8.1f}x")
+    print(f"max relative diff: {worst:.2e}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Indicator panel benchmark")
+    parser.add_argument('--tickers', type=int, default=2000)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--processes', type=int, nargs='*', default=[],
+                        help="Also time the shared-memory engine with these process counts")
+    parser.add_argument('--skip-legacy', action='store_true',
+                        help="Skip the per-ticker pandas baseline (it needs several GB at 5,000+ tickers)")
+    args = parser.parse_args()
+
+    close = synthetic_close_panel(args.tickers, args.years * 252)
+    print(f"panel: {args.tickers} tickers x {len(close)} days, {os.cpu_count()} CPUs")
+
+    started = time.perf_counter()
+    panel = compute_indicator_panel(close)
+    panel_seconds = time.perf_counter() - started
+    print(f"panel engine:      {panel_seconds:8.2f}s")
+
+    if not args.skip_legacy:
+        compare_legacy(close, panel, panel_seconds)
+
+    # Scaling against the single-process engine; efficiency is speedup per process
+    for processes in args.processes:
+        started = time.perf_counter()
+        parallel = compute_indicator_panel_parallel(close, processes)
+        seconds = time.perf_counter() - started
+        assert all(np.allclose(parallel[name], panel[name], equal_nan=True) for name in INDICATOR_COLUMNS)
+        del parallel
+        speedup = panel_seconds / seconds
+        print(f"{processes:2d} processes:      {seconds:8.2f}s ({speedup:.2f}x, {speedup / processes:.0%} efficiency)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# Cross-sectional queries over the Parquet market-data cache.
+#
+#     python -m benchmarks.lakequery --tickers 2000 --years 10 --lake-dir /tmp/lake
+#
+# The lake is written once (with the same writer the cache uses) and reused on later runs; the
+# first run also builds the yearly all-symbol snapshots that later loads read.
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from marketcache import save_coverage, write_cached
+from marketlake import load_lake, partition_index, query_rule, top_movers, year_snapshot
+from marketprovider import LocalProvider
+from ttlcache import TTLCache
+
+END_DATE = '2024-12-31'
+
+# Function to fill a cache directory with synthetic yearly partitions for n tickers
+def build_lake(lake_dir, n_tickers, years):
+    provider = LocalProvider(end_date=END_DATE)
+    start = pd.Timestamp(END_DATE) - pd.DateOffset(years=years)
+    end = pd.Timestamp(END_DATE) + pd.Timedelta(days=1)
+    for i in range(n_tickers):
+        symbol = f"SYM{i:04d}.NS"
+        history = provider.synthetic_history(symbol)
+        write_cached(symbol, history[history.index >= start].rename_axis('Date'), lake_dir)
+        save_coverage(symbol, [(start, end)], lake_dir)
+        provider.generated.clear()
+
+# Function to time a callable and print the result size
+def timed(label, function):
+    started = time.perf_counter()
+    result = function()
+    print(f"{label:<34}{time.perf_counter() - started:8.3f}s")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Market lake query benchmark")
+    parser.add_argument('--tickers', type=int, default=2000)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--lake-dir', default=os.path.join(tempfile.gettempdir(), 'market_lake_benchmark'))
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.lake_dir) or len(os.listdir(args.lake_dir)) < args.tickers:
+        timed(f"write lake ({args.tickers} tickers)", lambda: build_lake(args.lake_dir, args.tickers, args.years))
+
+    start = pd.Timestamp(END_DATE) - pd.DateOffset(years=args.years)
+    last_year = pd.Timestamp(END_DATE) - pd.DateOffset(years=1)
+    index = partition_index(args.lake_dir)
+    timed("build/check yearly snapshots", lambda: [year_snapshot(args.lake_dir, year, index.get(year, []))
+                                                   for year in range(start.year, int(END_DATE[:4]) + 1)])
+    cache = TTLCache()
+    lake = timed("load panels (new process)", lambda: load_lake(start, END_DATE, args.lake_dir, cache=cache))
+    timed("load panels (cached)", lambda: load_lake(start, END_DATE, args.lake_dir, cache=cache))
+    print(f"panel: {len(lake.tickers)} tickers x {len(lake.dates)} days")
+
+    gainers = timed("top 20 gainers per day, full range", lambda: top_movers(lake, 20))
+    timed("top 20 gainers per day, last year", lambda: top_movers(lake, 20, days=(lake.dates >= last_year).sum()))
+    crosses = timed("SMA_50 crosses SMA_200 this week", lambda: query_rule(lake, "SMA_50 crosses SMA_200", lookback=5))
+    timed("same query, SMAs already derived", lambda: query_rule(lake, "SMA_50 crosses SMA_200", lookback=5))
+    print(f"\n{len(gainers)} gainer rows; {crosses['Ticker'].nunique()} tickers crossed this week")
+
+if __name__ == '__main__':
+    main()
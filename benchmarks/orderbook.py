@@ -0,0 +1,33 @@
+# Bulk synthetic L2 order-book generation.
+#
+#     python -m benchmarks.orderbook --tickers 2000 --years 10 --levels 5
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.indicators import synthetic_close_panel
+from orderbook import depth_metrics, simulate_order_books
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic order book benchmark")
+    parser.add_argument('--tickers', type=int, default=2000)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--levels', type=int, default=5)
+    args = parser.parse_args()
+
+    close = synthetic_close_panel(args.tickers, args.years * 252)
+    volume = (close * 0 + 1) * 500000
+
+    started = time.perf_counter()
+    book = simulate_order_books(close, volume, list(close.columns), levels=args.levels)
+    metrics = depth_metrics(book)
+    seconds = time.perf_counter() - started
+
+    cells = book['bid_sizes'].size * 2
+    print(f"book: {args.tickers} tickers x {len(close)} bars x {args.levels} levels per side")
+    print(f"generate + metrics: {seconds:8.2f}s ({cells / seconds / 1e6:.1f}M book cells/s)")
+    print(f"mean |depth imbalance|: {np.nanmean(np.abs(metrics['Depth_Imbalance'])):.3f}")
+
+if __name__ == '__main__':
+    main()
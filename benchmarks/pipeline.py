@@ -0,0 +1,160 @@
+# Stage-by-stage benchmark of the stock analytics pipeline: fetch (from the offline
+# LocalProvider), indicator computation, and figure construction + JSON serialization.
+#
+#     python -m benchmarks.pipeline                          # 1/100/2000 tickers x 1/5/20 years
+#     python -m benchmarks.pipeline --tickers 100 --years 5  # one scenario
+#     python -m benchmarks.pipeline --compare benchmarks/results/abc1234.json
+#     python -m benchmarks.pipeline --memory                 # also record each stage's peak memory
+#
+# Results are written as JSON (default benchmarks/results/<commit>.json) so runs on two
+# commits can be diffed with --compare.
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from indicators import attach_indicators
+from marketdata import fetch_market_data_batch
+from marketprovider import LocalProvider
+from pathkernels import calculate_path_indicators
+from stockcharts import (plot_bid_offer_volumes, plot_daily_trend_with_indicators, plot_daywise_analysis,
+                         plot_macd, plot_rsi, plot_weekly_bid_offer_trends)
+
+END_DATE = '2024-12-31'
+
+# Function to time one stage and return (result, metrics). Tracing slows Python-heavy stages (figures) far more
+# than NumPy ones, so the timed pass runs untraced and peak memory comes from a second, traced pass
+def measure(stage, memory=False):
+    started = time.perf_counter()
+    result = stage()
+    metrics = {'seconds': round(time.perf_counter() - started, 4), 'peak_mb': None}
+    if memory:
+        tracemalloc.start()
+        stage()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        metrics['peak_mb'] = round(peak / 1e6, 2)
+    return result, metrics
+
+# Function to build and serialize every chart the stock apps draw for a ticker; returns JSON bytes
+def build_figures(market_data):
+    size = 0
+    for ticker, data in market_data.items():
+        for figure in (plot_daily_trend_with_indicators(data, ticker), plot_macd(data), plot_rsi(data),
+                       plot_daywise_analysis(data), plot_bid_offer_volumes(data), plot_weekly_bid_offer_trends(data)):
+            size += len(figure.to_json())
+    return size
+
+# Function to run every stage for one (tickers, years) scenario
+def run_scenario(n_tickers, years, figure_tickers, latency, cache_dir, memory=False):
+    tickers = [f"SYM{i:04d}" for i in range(n_tickers)]
+    start = (pd.Timestamp(END_DATE) - pd.DateOffset(years=years)).strftime('%Y-%m-%d')
+    provider = LocalProvider(latency=latency, end_date=END_DATE)
+    # Generate the synthetic histories up front so the fetch stage times the pipeline, not the generator
+    for ticker in tickers:
+        provider.synthetic_history(ticker + '.NS')
+
+    rows = []
+    requests = []
+
+    # Every pass fetches into a fresh cache directory, so the traced pass does not read the timed one's files
+    def fetch():
+        before = provider.calls
+        fetched = fetch_market_data_batch(tickers, start, END_DATE, provider=provider,
+                                          cache_dir=tempfile.mkdtemp(dir=cache_dir) if cache_dir else None)
+        requests.append(provider.calls - before)
+        return fetched
+
+    (market_data, _), metrics = measure(fetch, memory)
+    rows.append(dict(stage='fetch', requests=requests[0], **metrics))
+
+    market_data, metrics = measure(lambda: attach_indicators(market_data), memory)
+    rows.append(dict(stage='indicators', **metrics))
+
+    _, metrics = measure(lambda: [calculate_path_indicators(data) for data in market_data.values()], memory)
+    rows.append(dict(stage='path_indicators', **metrics))
+
+    charted = dict(list(market_data.items())[:figure_tickers])
+    figure_bytes, metrics = measure(lambda: build_figures(charted), memory)
+    rows.append(dict(stage='figures', figure_tickers=len(charted), figure_bytes=figure_bytes, **metrics))
+
+    for row in rows:
+        row.update(tickers=n_tickers, years=years)
+    return rows
+
+# Function to read the current commit for labelling results
+def current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+# Function to print the change in each metric against an earlier results file
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r['tickers'], r['years'], r['stage']): r for r in json.load(f)['results']}
+    print(f"\nvs {baseline_path}")
+    print(f"{'tickers':>8}{'years':>6} {'stage':<16}{'seconds':>18}{'peak MB':>18}")
+    for row in results:
+        old = baseline.get((row['tickers'], row['years'], row['stage']))
+        if old is None:
+            continue
+        changes = []
+        for key in ('seconds', 'peak_mb'):
+            if row.get(key) is None or old.get(key) is None:
+                changes.append('-')
+                continue
+            ratio = row[key] / old[key] if old[key] else float('nan')
+            changes.append(f"{old[key]:>8.2f}->{row[key]:<6.2f}{ratio:>4.1f}x")
+        print(f"{row['tickers']:>8}{row['years']:>6} {row['stage']:<16}" + ''.join(f"{c:>18}" for c in changes))
+
+def main():
+    parser = argparse.ArgumentParser(description="Stock analytics pipeline benchmark")
+    parser.add_argument('--tickers', type=int, nargs='+', default=[1, 100, 2000])
+    parser.add_argument('--years', type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--figure-tickers', type=int, default=100,
+                        help="Chart at most this many tickers per scenario (figures dominate run time)")
+    parser.add_argument('--latency', type=float, default=0.0, help="Simulated seconds per provider request")
+    parser.add_argument('--with-cache', action='store_true', help="Fetch through a fresh Parquet cache directory")
+    parser.add_argument('--output', help="Results JSON path (default benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', help="Earlier results JSON to diff against")
+    parser.add_argument('--memory', action='store_true',
+                        help="Run each stage a second time under tracemalloc to record its peak memory")
+    args = parser.parse_args()
+
+    commit = current_commit()
+    results = []
+    # Compile the Numba kernels once so the first scenario does not pay for it
+    warm_up = LocalProvider(end_date=END_DATE).synthetic_history('WARMUP.NS').tail(100).copy()
+    calculate_path_indicators(warm_up)
+    print(f"{'tickers':>8}{'years':>6} {'stage':<16}{'seconds':>10}{'peak MB':>10}{'figure MB':>11}")
+    for n_tickers in args.tickers:
+        for years in args.years:
+            with tempfile.TemporaryDirectory() as cache_dir:
+                rows = run_scenario(n_tickers, years, args.figure_tickers, args.latency,
+                                    cache_dir if args.with_cache else None, args.memory)
+            for row in rows:
+                figure_mb = f"{row['figure_bytes'] / 1e6:.2f}" if 'figure_bytes' in row else ''
+                peak_mb = f"{row['peak_mb']:.1f}" if row['peak_mb'] is not None else '-'
+                print(f"{n_tickers:>8}{years:>6} {row['stage']:<16}{row['seconds']:>10.3f}{peak_mb:>10}{figure_mb:>11}")
+            results.extend(rows)
+
+    output = args.output or os.path.join(os.path.dirname(__file__), 'results', f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({'commit': commit, 'created': pd.Timestamp.now().isoformat(), 'python': platform.python_version(),
+                   'results': results}, f, indent=2)
+    print(f"\nSaved {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+# Screener rule evaluation over a full indicator panel.
+#
+#     python -m benchmarks.screener --tickers 2000 --years 10 --rule "RSI < 40 and MACD crosses Signal_Line"
+import argparse
+import time
+
+from benchmarks.indicators import synthetic_close_panel
+from indicators import compute_indicator_panel
+from screener import Rule, screen_panel
+
+def main():
+    parser = argparse.ArgumentParser(description="Screener benchmark")
+    parser.add_argument('--tickers', type=int, default=2000)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--rule', default="RSI < 30 and Close > SMA_50 and MACD crosses Signal_Line")
+    args = parser.parse_args()
+
+    close = synthetic_close_panel(args.tickers, args.years * 252)
+    started = time.perf_counter()
+    panels = compute_indicator_panel(close)
+    panels['Close'] = close
+    indicator_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    rule = Rule(args.rule)
+    hits = screen_panel(panels, rule)
+    screen_seconds = time.perf_counter() - started
+
+    print(f"panel: {args.tickers} tickers x {len(close)} days")
+    print(f"rule:  {rule.text}")
+    print(f"indicators: {indicator_seconds:8.2f}s")
+    print(f"screen:     {screen_seconds:8.2f}s")
+    print(f"hits:       {len(hits):8d} rows, {hits['Ticker'].nunique()} tickers")
+
+if __name__ == '__main__':
+    main()
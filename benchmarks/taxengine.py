@@ -0,0 +1,46 @@
+# Slab-tax engine throughput against the per-income slab loop it replaced.
+#
+#     python -m benchmarks.taxengine --incomes 1000000
+import argparse
+import time
+
+import numpy as np
+
+from taxengine import REGIME_TABLES
+
+# Function to compute tax the way the calculators did before: one Python loop over the slabs per income
+def loop_tax(income, slabs):
+    tax = 0.0
+    previous_limit = 0
+    for limit, rate in slabs:
+        if income > limit:
+            tax += (limit - previous_limit) * rate
+            previous_limit = limit
+        else:
+            tax += max(income - previous_limit, 0) * rate
+            break
+    return tax
+
+def main():
+    parser = argparse.ArgumentParser(description="Slab-tax engine benchmark")
+    parser.add_argument('--incomes', type=int, default=1000000)
+    parser.add_argument('--loop-sample', type=int, default=100000)
+    args = parser.parse_args()
+
+    incomes = np.random.default_rng(0).uniform(0, 5e7, args.incomes)
+    sample = incomes[:args.loop_sample].tolist()
+    print(f"{args.incomes} incomes; loop timed on {len(sample)} and scaled")
+    for regime, table in REGIME_TABLES.items():
+        started = time.perf_counter()
+        taxes = table.tax(incomes)
+        engine_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        reference = [loop_tax(income, table.slabs) for income in sample]
+        loop_seconds = (time.perf_counter() - started) * args.incomes / len(sample)
+        assert np.allclose(taxes[:len(sample)], reference)
+        print(f"{regime:16s} engine {engine_seconds * 1000:8.1f} ms   loop {loop_seconds * 1000:9.1f} ms   "
+              f"x{loop_seconds / engine_seconds:6.0f}")
+
+if __name__ == '__main__':
+    main()
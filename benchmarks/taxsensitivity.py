@@ -0,0 +1,35 @@
+# Cost of the tax sensitivity curves: the dense grid through the slab engine, the downsampled figures and
+# their JSON on a cold cache, then the cached answer the Flask /sensitivity route serves afterwards.
+#
+#     python -m benchmarks.taxsensitivity --step 100 --max-income 10000000
+import argparse
+import time
+
+from taxengine import REGIME_TABLES
+from taxsensitivity import crossovers, sensitivity_curves, sensitivity_figures, sensitivity_graphs
+from ttlcache import TTLCache
+
+def timed(label, call):
+    started = time.perf_counter()
+    result = call()
+    print(f"{label:28s} {(time.perf_counter() - started) * 1000:9.2f} ms")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Tax sensitivity curve benchmark")
+    parser.add_argument('--step', type=float, default=100)
+    parser.add_argument('--max-income', type=float, default=10000000)
+    args = parser.parse_args()
+
+    cache = TTLCache(ttl=3600)
+    deductions = {name: 100000 for name in REGIME_TABLES}
+    grid = (args.max_income, args.step)
+    curves = timed('curves (all regimes)', lambda: sensitivity_curves(REGIME_TABLES, deductions, *grid, cache=cache))
+    print(f"{len(curves)} incomes x {len(REGIME_TABLES)} regimes")
+    timed('crossovers', lambda: crossovers(curves))
+    timed('downsampled figures', lambda: sensitivity_figures(REGIME_TABLES, deductions, *grid, cache=cache))
+    timed('graphs JSON', lambda: sensitivity_graphs(REGIME_TABLES, deductions, *grid, cache=cache))
+    timed('graphs JSON (cached)', lambda: sensitivity_graphs(REGIME_TABLES, deductions, *grid, cache=cache))
+
+if __name__ == '__main__':
+    main()
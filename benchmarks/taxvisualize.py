@@ -0,0 +1,74 @@
+# /visualize latency of the Flask tax calculators under concurrent requests, against rebuilding
+# the same three figures with plotly.express on every request.
+#
+#     python -m benchmarks.taxvisualize --requests 400 --threads 8
+import argparse
+import importlib.util
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+
+APPS = ['taxcal.py', 'newtaxcal.py', 'newtaxcal2024-25.py']
+
+# Function to import a calculator by file name (newtaxcal2024-25 is not a valid module name)
+def load_app(filename):
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), filename)
+    spec = importlib.util.spec_from_file_location(filename[:-3].replace('-', '_'), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+# Function to build and serialize the three figures the way /visualize did before the templates
+def rebuild_figures(labels, taxes, rate, deductions):
+    fig = px.bar(pd.DataFrame({"Income Range": labels, "Effective Tax": taxes}), x="Income Range", y="Effective Tax",
+                 title="Effective Tax per Income Range", labels={"Effective Tax": "Tax Amount in ₹"})
+    fig_rate = px.bar(pd.DataFrame({"Effective Tax Rate (%)": [rate]}), y="Effective Tax Rate (%)", title="Effective Tax Rate")
+    fig_deductions = px.bar(pd.DataFrame({"Type": list(deductions), "Amount (₹)": list(deductions.values())}),
+                            x="Type", y="Amount (₹)", title="Impact of Deductions")
+    return pio.to_json(fig), pio.to_json(fig_rate), pio.to_json(fig_deductions)
+
+# Function to send requests from a thread pool and collect each one's latency in seconds
+def measure(call, requests, threads):
+    def timed(i):
+        started = time.perf_counter()
+        call(i)
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return np.array(list(pool.map(timed, range(requests))))
+
+def report(label, latencies):
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f"{label:32s} p50 {p50:8.2f} ms   p99 {p99:8.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Tax /visualize benchmark")
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    incomes = np.random.default_rng(0).uniform(2e5, 5e6, args.requests)
+    labels = [f"Slab {i}" for i in range(6)]
+    report('plotly.express rebuild', measure(
+        lambda i: rebuild_figures(labels, list(np.linspace(0, incomes[i], 6)), 10.0,
+                                  {'Income': incomes[i], 'Standard Deduction': -50000.0}),
+        args.requests, args.threads))
+
+    for filename in APPS:
+        client = load_app(filename).test_client()
+        regime = 'new_2024_25' if '2024' in filename else 'old'
+
+        def call(i):
+            response = client.post('/visualize', json={'income': float(incomes[i]), 'std_deduction': 50000,
+                                                       'nps_contribution': 50000, 'regime': regime})
+            assert response.status_code == 200
+
+        report(f"{filename} /visualize", measure(call, args.requests, args.threads))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+# Day names for integer day-of-week codes 0-4 (pandas dayofweek: Monday = 0)
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+
+# Function to encode a DatetimeIndex as int8 day-of-week codes
+def weekday_codes(index):
+    return pd.DatetimeIndex(index).dayofweek.to_numpy().astype(np.int8)
+
+# Function to average columns by weekday with integer group codes (NaNs skipped, like groupby().mean())
+def weekday_means(data, columns):
+    if 'DayOfWeek' in data and pd.api.types.is_integer_dtype(data['DayOfWeek']):
+        codes = data['DayOfWeek'].to_numpy()
+    else:
+        codes = weekday_codes(data.index)
+    means = {}
+    for column in columns:
+        values = data[column].to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        totals = np.bincount(codes[valid], weights=values[valid], minlength=7)[:len(WEEKDAYS)]
+        counts = np.bincount(codes[valid], minlength=7)[:len(WEEKDAYS)]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means[column] = totals / counts
+    return pd.DataFrame(means, index=pd.Index(WEEKDAYS, name='DayOfWeek'))
+
+# Function to store a ticker's frame compactly: every float column (prices and indicators) in one
+# contiguous float32 block, integer volumes, and an int8 DayOfWeek code instead of day-name strings
+def compact_frame(data):
+    data = data.drop(columns=['DayOfWeek'], errors='ignore')
+    float_columns = [column for column, dtype in data.dtypes.items() if pd.api.types.is_float_dtype(dtype)]
+    block = data[float_columns].to_numpy(dtype=np.float32)
+    compact = pd.DataFrame(block, index=data.index, columns=float_columns, copy=False)
+    others = {}
+    for column in data.columns.difference(float_columns, sort=False):
+        values = data[column].to_numpy()
+        if np.issubdtype(values.dtype, np.integer) and len(values) \
+                and np.iinfo(np.int32).min <= values.min() and values.max() <= np.iinfo(np.int32).max:
+            values = values.astype(np.int32)
+        others[column] = values
+    others['DayOfWeek'] = weekday_codes(data.index)
+    return pd.concat([compact, pd.DataFrame(others, index=data.index)], axis=1)
+
+# Function to compact every frame of {ticker: frame}
+def compact_market_data(market_data):
+    return {ticker: compact_frame(data) for ticker, data in market_data.items()}
+
+# Function to measure the in-memory size of {ticker: frame} in bytes, strings included
+def market_data_memory(market_data):
+    return int(sum(data.memory_usage(deep=True).sum() for data in market_data.values()))
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+# Streamlit charts are about a thousand pixels wide, so more points than this are never visible
+MAX_POINTS = 1200
+# Line traces with more points than this are drawn with WebGL (go.Scattergl)
+WEBGL_THRESHOLD = 1000
+
+# Function to turn dates or numbers into float positions for area calculations
+def numeric_axis(x):
+    if isinstance(x, pd.DatetimeIndex) or np.issubdtype(np.asarray(x).dtype, np.datetime64):
+        return pd.DatetimeIndex(x).asi8.astype(float)
+    return np.asarray(x, dtype=float)
+
+# Function to pick indices with Largest-Triangle-Three-Buckets, keeping visual peaks and troughs
+def lttb_indices(x, y, threshold):
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = numeric_axis(x)
+    y = np.asarray(y, dtype=float)
+
+    # threshold - 2 buckets between the fixed first and last points
+    every = (n - 2) / (threshold - 2)
+    edges = np.floor(np.arange(threshold - 1) * every).astype(int) + 1
+    edges[-1] = n - 1
+    # Mean of every bucket, used as the third triangle corner for the bucket before it
+    sizes = np.diff(np.append(edges, n))
+    mean_x = np.add.reduceat(x, edges) / sizes
+    mean_y = np.add.reduceat(y, edges) / sizes
+
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    anchor = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        ax, ay = x[anchor], y[anchor]
+        area = np.abs((ax - mean_x[i + 1]) * (y[start:stop] - ay) - (ax - x[start:stop]) * (mean_y[i + 1] - ay))
+        anchor = start + int(np.argmax(area))
+        selected[i + 1] = anchor
+    return selected
+
+# Function to downsample one line series, dropping NaNs (e.g. indicator warm-up) first
+def downsample_xy(x, y, max_points=MAX_POINTS):
+    x = pd.Index(x) if not isinstance(x, pd.Index) else x
+    y = np.asarray(y, dtype=float)
+    valid = ~np.isnan(y)
+    if not valid.all():
+        x, y = x[valid], y[valid]
+    if max_points is None or len(y) <= max_points:
+        return x, y
+    keep = lttb_indices(x, y, max_points)
+    return x[keep], y[keep]
+
+# Function to keep the tallest bar of each of max_points buckets
+def downsample_bars(x, y, max_points=MAX_POINTS):
+    x = pd.Index(x) if not isinstance(x, pd.Index) else x
+    y = np.asarray(y, dtype=float)
+    if max_points is None or len(y) <= max_points:
+        return x, y
+    buckets = np.arange(len(y)) * max_points // len(y)
+    # Sort by bucket, tallest first, then take the first entry of each bucket
+    order = np.lexsort((-np.nan_to_num(y, nan=-np.inf), buckets))
+    _, first = np.unique(buckets[order], return_index=True)
+    keep = np.sort(order[first])
+    return x[keep], y[keep]
@@ -0,0 +1,105 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from marketdata import BATCH_SIZE, normalize_ticker
+from marketprovider import get_provider
+from ttlcache import CACHE_TTL, TTLCache
+
+# Upper bound on concurrent yfinance requests
+MAX_WORKERS = 16
+
+# Fields read from Ticker.info, keyed by the summary table column
+INFO_FIELDS = {
+    'Market Cap': 'marketCap',
+    '52-Week High': 'fiftyTwoWeekHigh',
+    '52-Week Low': 'fiftyTwoWeekLow',
+    'PE Ratio': 'trailingPE',
+    'Dividend Yield': 'dividendYield',
+    'Beta': 'beta',
+}
+
+# Module-level so a re-click in the same Streamlit server process hits memory; rows are served for CACHE_TTL seconds
+info_cache = TTLCache(ttl=CACHE_TTL)
+history_cache = TTLCache(ttl=CACHE_TTL)
+
+# Function to build an all-empty summary row for a symbol with no data
+def empty_row(symbol):
+    row = {'Instrument': symbol, 'Latest Value': None, 'Open': None, 'High': None, 'Low': None, 'Volume': None}
+    row.update({column: None for column in INFO_FIELDS})
+    return row
+
+# Function to download recent daily history for many symbols in grouped requests
+def fetch_price_history(symbols, period='1mo', provider=None, cache=history_cache):
+    provider = provider or get_provider()
+    history = {}
+    # Provider symbol -> every spelling asking for it (TCS and TCS.NS share one download)
+    missing = {}
+    for symbol in dict.fromkeys(symbols):
+        cached = cache.get((symbol, period))
+        if cached is not None:
+            history[symbol] = cached
+        else:
+            missing.setdefault(normalize_ticker(symbol), []).append(symbol)
+    yf_symbols = list(missing)
+    for i in range(0, len(yf_symbols), BATCH_SIZE):
+        chunk = yf_symbols[i:i + BATCH_SIZE]
+        try:
+            downloaded = provider.download(chunk, period=period)
+        except Exception:
+            continue
+        for yf_symbol, frame in downloaded.items():
+            for symbol in missing.get(yf_symbol, []):
+                history[symbol] = frame
+                cache.put((symbol, period), frame)
+    return history
+
+# Function to read the fundamentals fields for one symbol with a single Ticker.info lookup
+def fetch_info(symbol, provider=None):
+    info = (provider or get_provider()).info(normalize_ticker(symbol))
+    return {column: info.get(field, None) for column, field in INFO_FIELDS.items()}
+
+# Function to fetch fundamentals for many symbols on a bounded thread pool, reusing fresh cached ones
+def fetch_infos(symbols, fetch=fetch_info, cache=info_cache, max_workers=MAX_WORKERS):
+    infos = {}
+    missing = []
+    for symbol in dict.fromkeys(symbols):
+        cached = cache.get(symbol)
+        if cached is not None:
+            infos[symbol] = cached
+        else:
+            missing.append(symbol)
+
+    def fetch_or_none(symbol):
+        try:
+            return fetch(symbol)
+        except Exception:
+            return None
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as pool:
+            for symbol, info in zip(missing, pool.map(fetch_or_none, missing)):
+                # Only remember real answers so a transient failure is retried next click
+                if info is not None:
+                    cache.put(symbol, info)
+                    infos[symbol] = info
+    return infos
+
+# Function to build the summary table rows from the shared price history plus fundamentals
+def fetch_stock_rows(symbols, history=None):
+    if history is None:
+        history = fetch_price_history(symbols)
+    infos = fetch_infos([symbol for symbol in symbols if symbol in history])
+    rows = []
+    for symbol in symbols:
+        row = empty_row(symbol)
+        if symbol in history:
+            latest = history[symbol].iloc[-1]
+            row.update({
+                'Latest Value': latest['Close'],
+                'Open': latest['Open'],
+                'High': latest['High'],
+                'Low': latest['Low'],
+                'Volume': latest['Volume'],
+            })
+            row.update(infos.get(symbol, {}))
+        rows.append(row)
+    return rows
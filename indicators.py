@@ -0,0 +1,396 @@
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+# Column names produced for every ticker, in the order the apps have always added them
+INDICATOR_COLUMNS = ['SMA_20', 'SMA_50', 'EMA_20', 'EMA_12', 'EMA_26', 'MACD', 'Signal_Line',
+                     'BB_Middle', 'BB_Upper', 'BB_Lower', 'RSI']
+
+
+# Function to build running sums once so every window length can be read off them
+def prefix_sums(values, with_squares=False):
+    valid = ~np.isnan(values)
+    # Centre each column on its first valid value so the running sums stay small
+    first = valid.argmax(axis=0)
+    reference = values[first, np.arange(values.shape[1])]
+    reference = np.where(np.isnan(reference), 0.0, reference)
+    centred = values - reference
+    centred[~valid] = 0.0
+
+    zeros = np.zeros((1, values.shape[1]))
+    prefix = {
+        'reference': reference,
+        'sum': np.concatenate([zeros, np.cumsum(centred, axis=0)]),
+        'count': None if valid.all() else np.concatenate([zeros, np.cumsum(valid, axis=0)]),
+    }
+    if with_squares:
+        prefix['square'] = np.concatenate([zeros, np.cumsum(centred * centred, axis=0)])
+    return prefix
+
+# Function to read rolling(window) sums of one running total, NaN where pandas would be
+def window_sums(prefix, key, window):
+    running = prefix[key]
+    sums = np.empty((running.shape[0] - 1, running.shape[1]))
+    sums[:window - 1] = np.nan
+    np.subtract(running[window:], running[:-window], out=sums[window - 1:])
+    if prefix['count'] is not None:
+        # Like pandas rolling(window), any missing value in the window gives NaN
+        incomplete = (prefix['count'][window:] - prefix['count'][:-window]) < window
+        np.copyto(sums[window - 1:], np.nan, where=incomplete)
+    return sums
+
+# Function to compute the rolling mean from shared running sums
+def rolling_mean(prefix, window):
+    return window_sums(prefix, 'sum', window) / window + prefix['reference']
+
+# Function to compute the rolling sample std from the same running sums as the mean
+def rolling_std(prefix, window):
+    sums = window_sums(prefix, 'sum', window)
+    squares = window_sums(prefix, 'square', window)
+    variance = (squares - sums * sums / window) / (window - 1)
+    return np.sqrt(np.maximum(variance, 0.0))
+
+# Function to run ewm(span, adjust=False) step by step, matching pandas NaN handling
+def ewm_loop(values, alpha):
+    decay = 1.0 - alpha
+    result = np.empty((len(alpha),) + values.shape)
+    weighted = np.broadcast_to(values[0], (len(alpha), values.shape[1])).copy()
+    old_weight = np.ones_like(weighted)
+    result[:, 0] = weighted
+    for i in range(1, values.shape[0]):
+        current = values[i]
+        observed = ~np.isnan(current)
+        started = ~np.isnan(weighted)
+        old_weight = np.where(started, old_weight * decay, old_weight)
+        update = started & observed
+        blended = (old_weight * weighted + alpha * current) / (old_weight + alpha)
+        weighted = np.where(update, blended, np.where(~started & observed, current, weighted))
+        old_weight = np.where(update, 1.0, old_weight)
+        result[:, i] = weighted
+    return result
+
+# Function to run ewm(span, adjust=False) on gap-free columns as block matrix products
+def ewm_blocked(values, alpha, block=32):
+    result = np.empty((len(alpha),) + values.shape)
+    steps = np.arange(block)
+    lags = steps[:, None] - steps[None, :]
+    for k, a in enumerate(alpha[:, 0]):
+        decay = 1.0 - a
+        # Row j of the kernel holds the weights of the block's inputs for output j
+        kernel = np.where(lags >= 0, a * decay ** np.maximum(lags, 0), 0.0)
+        carry = decay ** (steps + 1)
+        previous = values[0]
+        for start in range(0, values.shape[0], block):
+            chunk = values[start:start + block]
+            size = len(chunk)
+            weighted = kernel[:size, :size] @ chunk + carry[:size, None] * previous
+            result[k, start:start + size] = weighted
+            previous = weighted[-1]
+    return result
+
+# Function to run the blocked ewm on columns whose NaNs are all leading
+def ewm_filled(values, alpha, first, leading):
+    if not leading.any():
+        return ewm_blocked(values, alpha)
+    # Back-fill the leading NaNs with the first price: the recursion then holds it flat
+    first = np.minimum(first, values.shape[0] - 1)
+    filled = np.where(leading, values[first, np.arange(values.shape[1])], values)
+    result = ewm_blocked(filled, alpha)
+    np.copyto(result, np.nan, where=leading)
+    return result
+
+# Function to compute several ewm(span, adjust=False) series over a (dates x tickers) array
+def ewm_panel(values, spans):
+    alpha = (2.0 / (np.asarray(spans, dtype=float) + 1.0))[:, None]
+    valid = ~np.isnan(values)
+    first = np.where(valid.any(axis=0), valid.argmax(axis=0), values.shape[0])
+    leading = np.arange(values.shape[0])[:, None] < first
+    # Columns whose only NaNs are before the first price take the fast path
+    gaps = (~valid & ~leading).any(axis=0)
+
+    if not gaps.any():
+        return ewm_filled(values, alpha, first, leading)
+    result = np.empty((len(spans),) + values.shape)
+    if not gaps.all():
+        result[:, :, ~gaps] = ewm_filled(values[:, ~gaps], alpha, first[~gaps], leading[:, ~gaps])
+    result[:, :, gaps] = ewm_loop(values[:, gaps], alpha)
+    return result
+
+# Function to compute the apps' RSI (simple rolling means of gains and losses) for a (dates x tickers) array
+def rolling_rsi(values, period=14):
+    delta = np.full(values.shape, np.nan)
+    delta[1:] = values[1:] - values[:-1]
+    # Rows before a ticker's first close stay NaN so it matches a standalone series
+    valid = ~np.isnan(values)
+    first = np.where(valid.any(axis=0), valid.argmax(axis=0), len(values))
+    before_first = np.arange(len(values))[:, None] < first
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    if before_first.any():
+        np.copyto(gain, np.nan, where=before_first)
+        np.copyto(loss, np.nan, where=before_first)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_gain = rolling_mean(prefix_sums(gain), period)
+        avg_loss = rolling_mean(prefix_sums(loss), period)
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+# Function to compute every indicator for every column of a (dates x tickers) close panel
+def compute_indicator_panel(close):
+    frame = close if isinstance(close, pd.DataFrame) else None
+    values = np.asarray(close, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # One set of running sums feeds SMA_20, SMA_50, BB_Middle and the band width
+        close_sums = prefix_sums(values, with_squares=True)
+        sma_20 = rolling_mean(close_sums, 20)
+        sma_50 = rolling_mean(close_sums, 50)
+        std_20 = rolling_std(close_sums, 20)
+        ema_20, ema_12, ema_26 = ewm_panel(values, [20, 12, 26])
+        macd = ema_12 - ema_26
+        signal_line = ewm_panel(macd, [9])[0]
+
+        rsi = rolling_rsi(values, 14)
+
+    panel = {
+        'SMA_20': sma_20,
+        'SMA_50': sma_50,
+        'EMA_20': ema_20,
+        'EMA_12': ema_12,
+        'EMA_26': ema_26,
+        'MACD': macd,
+        'Signal_Line': signal_line,
+        'BB_Middle': sma_20,
+        'BB_Upper': sma_20 + 2 * std_20,
+        'BB_Lower': sma_20 - 2 * std_20,
+        'RSI': rsi,
+    }
+    if frame is not None:
+        panel = {name: pd.DataFrame(array, index=frame.index, columns=frame.columns, copy=False)
+                 for name, array in panel.items()}
+    return panel
+
+# Shared-memory close and output panels, attached once in every indicator worker process
+shared_blocks = []
+shared_close = None
+shared_output = None
+
+# Function to attach to a block the parent process owns. Before Python 3.13 attaching also registers the
+# block with the resource tracker as if this process had created it, which brings leak warnings or a second
+# unlink; registration is skipped so only the parent's create/unlink is tracked
+def attach_shared_block(name):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None if rtype == 'shared_memory' else register(name, rtype)
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+# Function to attach a worker process to the shared close and output panels
+def init_panel_worker(close_name, output_name, shape):
+    global shared_blocks, shared_close, shared_output
+    # Keep the blocks referenced for the life of the worker so the views stay valid
+    shared_blocks = [attach_shared_block(close_name), attach_shared_block(output_name)]
+    shared_close = np.ndarray(shape, dtype=float, buffer=shared_blocks[0].buf)
+    shared_output = np.ndarray((len(INDICATOR_COLUMNS),) + shape, dtype=float, buffer=shared_blocks[1].buf)
+
+# Function to compute the indicators for tickers [start, stop) straight into the shared output panel
+def compute_panel_shard(bounds):
+    start, stop = bounds
+    panel = compute_indicator_panel(shared_close[:, start:stop])
+    for k, name in enumerate(INDICATOR_COLUMNS):
+        shared_output[k, :, start:stop] = panel[name]
+    return stop - start
+
+# Function to compute the indicator panel with tickers sharded across processes; workers read the
+# closes from shared memory instead of receiving pickled copies. Not used by attach_indicators yet:
+# benchmarks.indicators --processes measures whether it scales on the target machine
+def compute_indicator_panel_parallel(close, processes=None):
+    processes = processes or os.cpu_count() or 1
+    values = np.asarray(close, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    shape = values.shape
+    close_block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    output_block = shared_memory.SharedMemory(create=True, size=max(values.nbytes * len(INDICATOR_COLUMNS), 1))
+    try:
+        shared = np.ndarray(shape, dtype=float, buffer=close_block.buf)
+        shared[:] = values
+        # A few shards per process so one slow shard does not hold up the rest
+        edges = np.linspace(0, shape[1], min(processes * 4, shape[1]) + 1).astype(int)
+        with ProcessPoolExecutor(max_workers=processes, initializer=init_panel_worker,
+                                 initargs=(close_block.name, output_block.name, shape)) as pool:
+            list(pool.map(compute_panel_shard, zip(edges[:-1].tolist(), edges[1:].tolist())))
+        output = np.ndarray((len(INDICATOR_COLUMNS),) + shape, dtype=float, buffer=output_block.buf).copy()
+        del shared
+    finally:
+        for block in (close_block, output_block):
+            block.close()
+            block.unlink()
+    panel = {name: output[k] for k, name in enumerate(INDICATOR_COLUMNS)}
+    if isinstance(close, pd.DataFrame):
+        panel = {name: pd.DataFrame(array, index=close.index, columns=close.columns, copy=False)
+                 for name, array in panel.items()}
+    return panel
+
+# Function to build a wide (dates x tickers) matrix of one column from per-ticker frames
+def price_panel(market_data, column='Close'):
+    return pd.concat({ticker: data[column] for ticker, data in market_data.items()}, axis=1).sort_index()
+
+# Function to rebase every column of a price panel to 100 at its first available close
+def rebase_to_100(prices):
+    prices = prices.ffill()
+    return prices / prices.bfill().iloc[0] * 100
+
+# Function to calculate technical indicators for a single ticker's frame
+def calculate_technical_indicators(data):
+    panel = compute_indicator_panel(data['Close'].to_numpy(dtype=float))
+    for name in INDICATOR_COLUMNS:
+        data[name] = panel[name][:, 0]
+    return data
+
+# Function to add indicator columns to every frame in {ticker: frame} with one panel computation
+def attach_indicators(market_data):
+    if not market_data:
+        return market_data
+    # Windows count rows, not dates, so right-align each ticker's closes by position;
+    # a ticker that skipped a session then gets exactly its standalone result
+    length = max(len(data) for data in market_data.values())
+    close = np.full((length, len(market_data)), np.nan)
+    for i, data in enumerate(market_data.values()):
+        close[length - len(data):, i] = data['Close'].to_numpy(dtype=float)
+    panel = compute_indicator_panel(close)
+    for i, data in enumerate(market_data.values()):
+        for name in INDICATOR_COLUMNS:
+            data[name] = panel[name][length - len(data):, i]
+    return market_data
+
+# Running indicator state for one ticker: seed it from history, then feed it one close per bar
+class StreamingIndicators:
+    EMA_SPANS = {'EMA_20': 20, 'EMA_12': 12, 'EMA_26': 26}
+
+    def __init__(self):
+        self.closes = deque(maxlen=50)
+        self.changes = deque(maxlen=14)
+        self.reference = None
+        self.sum_20 = self.square_20 = self.sum_50 = 0.0
+        self.gain_14 = self.loss_14 = 0.0
+        self.ema = {name: np.nan for name in self.EMA_SPANS}
+        self.signal_line = np.nan
+        self.previous = None
+
+    # Function to seed the state from a close history using the panel engine
+    @classmethod
+    def from_history(cls, close):
+        close = np.asarray(close, dtype=float)
+        close = close[~np.isnan(close)]
+        stream = cls()
+        if len(close) == 0:
+            return stream
+        # Replay only the tail the windows can see; the EWMs come from the full history
+        tail = close[-51:]
+        for value in tail[:-1]:
+            stream.update(value)
+        if len(close) > len(tail):
+            panel = compute_indicator_panel(close[:-1])
+            stream.ema = {name: panel[name][-1, 0] for name in cls.EMA_SPANS}
+            stream.signal_line = panel['Signal_Line'][-1, 0]
+        stream.update(close[-1])
+        return stream
+
+    # Function to add one close-to-close change to the 14-bar gain/loss window
+    def push_change(self, change):
+        if len(self.changes) == self.changes.maxlen:
+            old = self.changes[0]
+            self.gain_14 -= max(old, 0.0)
+            self.loss_14 -= max(-old, 0.0)
+        self.changes.append(change)
+        self.gain_14 += max(change, 0.0)
+        self.loss_14 += max(-change, 0.0)
+
+    # Function to advance every indicator by one bar (a close price or a mapping with 'Close')
+    def update(self, bar):
+        close = float(bar['Close']) if isinstance(bar, (dict, pd.Series)) else float(bar)
+        if self.reference is None:
+            self.reference = close
+        # Keep just enough to undo this bar in revise(): the scalars and the evicted entries
+        self.previous = (self.sum_20, self.square_20, self.sum_50, self.gain_14, self.loss_14,
+                         dict(self.ema), self.signal_line,
+                         self.closes[0] if len(self.closes) == self.closes.maxlen else None,
+                         self.changes[0] if len(self.changes) == self.changes.maxlen else None)
+        centred = close - self.reference
+
+        # Rolling sums: add the new close, drop the ones that left each window
+        if len(self.closes) >= 20:
+            old = self.closes[-20] - self.reference
+            self.sum_20 -= old
+            self.square_20 -= old * old
+        if len(self.closes) == 50:
+            self.sum_50 -= self.closes[0] - self.reference
+        self.sum_20 += centred
+        self.square_20 += centred * centred
+        self.sum_50 += centred
+
+        # The first bar's change counts as zero, as diff().fillna(0) does in batch
+        self.push_change(close - self.closes[-1] if self.closes else 0.0)
+        self.closes.append(close)
+
+        for name, span in self.EMA_SPANS.items():
+            alpha = 2.0 / (span + 1.0)
+            previous = self.ema[name]
+            self.ema[name] = close if np.isnan(previous) else (1 - alpha) * previous + alpha * close
+        macd = self.ema['EMA_12'] - self.ema['EMA_26']
+        alpha = 2.0 / (9 + 1.0)
+        self.signal_line = macd if np.isnan(self.signal_line) else (1 - alpha) * self.signal_line + alpha * macd
+        return self.values()
+
+    # Function to replace the latest bar (e.g. an intraday revision of today's close)
+    def revise(self, bar):
+        if self.previous is None:
+            return self.update(bar)
+        self.sum_20, self.square_20, self.sum_50, self.gain_14, self.loss_14, \
+            self.ema, self.signal_line, evicted_close, evicted_change = self.previous
+        self.closes.pop()
+        self.changes.pop()
+        if evicted_close is not None:
+            self.closes.appendleft(evicted_close)
+        if evicted_change is not None:
+            self.changes.appendleft(evicted_change)
+        return self.update(bar)
+
+    # Function to read the current indicator values under the batch column names
+    def values(self):
+        count = len(self.closes)
+        sma_20 = self.sum_20 / 20 + self.reference if count >= 20 else np.nan
+        sma_50 = self.sum_50 / 50 + self.reference if count >= 50 else np.nan
+        std_20 = np.nan
+        if count >= 20:
+            mean = self.sum_20 / 20
+            std_20 = np.sqrt(max((self.square_20 - self.sum_20 * mean) / 19, 0.0))
+        rsi = np.nan
+        if len(self.changes) == 14:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                rs = np.float64(self.gain_14) / np.float64(self.loss_14)
+                rsi = 100 - (100 / (1 + rs))
+        macd = self.ema['EMA_12'] - self.ema['EMA_26']
+        return {
+            'SMA_20': sma_20,
+            'SMA_50': sma_50,
+            'EMA_20': self.ema['EMA_20'],
+            'EMA_12': self.ema['EMA_12'],
+            'EMA_26': self.ema['EMA_26'],
+            'MACD': macd,
+            'Signal_Line': self.signal_line,
+            'BB_Middle': sma_20,
+            'BB_Upper': sma_20 + 2 * std_20,
+            'BB_Lower': sma_20 - 2 * std_20,
+            'RSI': rsi,
+        }
@@ -0,0 +1,141 @@
+import os
+import json
+import datetime
+
+import pandas as pd
+
+# Root of the on-disk OHLCV store: <CACHE_DIR>/<symbol>/<year>.parquet plus coverage.json
+CACHE_DIR = os.environ.get('MARKET_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.market_cache'))
+
+# Function to turn a date, datetime or string into a midnight timestamp
+def to_timestamp(value):
+    value = pd.Timestamp(value)
+    if value.tzinfo is not None:
+        value = value.tz_localize(None)
+    return value.normalize()
+
+# Function to get the directory holding one symbol's partitions
+def symbol_dir(symbol, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, symbol.replace('/', '_'))
+
+# Function to merge overlapping or touching [start, end) intervals
+def merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+# Function to list the parts of [start, end) not yet covered by the cache
+def missing_ranges(coverage, start, end):
+    gaps = []
+    cursor = start
+    for covered_start, covered_end in merge_intervals(coverage):
+        if covered_end <= cursor:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > cursor:
+            gaps.append((cursor, min(covered_start, end)))
+        cursor = max(cursor, covered_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+# Function to read the date ranges already stored for a symbol
+def load_coverage(symbol, cache_dir=CACHE_DIR):
+    path = os.path.join(symbol_dir(symbol, cache_dir), 'coverage.json')
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [(pd.Timestamp(s), pd.Timestamp(e)) for s, e in json.load(f)]
+
+# Function to persist the date ranges stored for a symbol
+def save_coverage(symbol, coverage, cache_dir=CACHE_DIR):
+    os.makedirs(symbol_dir(symbol, cache_dir), exist_ok=True)
+    path = os.path.join(symbol_dir(symbol, cache_dir), 'coverage.json')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump([[s.strftime('%Y-%m-%d'), e.strftime('%Y-%m-%d')] for s, e in merge_intervals(coverage)], f)
+    os.replace(tmp_path, path)
+
+# Function to read cached rows for a symbol between start (inclusive) and end (exclusive)
+def read_cached(symbol, start, end, cache_dir=CACHE_DIR):
+    frames = []
+    for year in range(start.year, end.year + 1):
+        path = os.path.join(symbol_dir(symbol, cache_dir), f"{year}.parquet")
+        if os.path.exists(path):
+            frames.append(pd.read_parquet(path))
+    if not frames:
+        return pd.DataFrame()
+    data = pd.concat(frames).sort_index()
+    return data[(data.index >= start) & (data.index < end)]
+
+# Function to merge newly downloaded rows into the symbol's yearly partitions
+def write_cached(symbol, data, cache_dir=CACHE_DIR):
+    if data.empty:
+        return
+    os.makedirs(symbol_dir(symbol, cache_dir), exist_ok=True)
+    for year, rows in data.groupby(data.index.year):
+        path = os.path.join(symbol_dir(symbol, cache_dir), f"{year}.parquet")
+        if os.path.exists(path):
+            rows = pd.concat([pd.read_parquet(path), rows])
+            rows = rows[~rows.index.duplicated(keep='last')]
+        tmp_path = path + '.tmp'
+        rows.sort_index().to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+
+# Function to strip timezones and index names so cached and fresh rows line up
+def clean_download(data):
+    data = data.copy()
+    if getattr(data.index, 'tz', None) is not None:
+        data.index = data.index.tz_localize(None)
+    data.index = pd.DatetimeIndex(data.index).normalize()
+    data.index.name = 'Date'
+    data.columns = [str(c) for c in data.columns]
+    return data
+
+# Function to serve symbols from the cache, downloading only the missing date ranges. fetch_batch(symbols,
+# start, end) returns ({symbol: frame}, symbols whose download failed); only answered symbols gain coverage
+def fetch_cached_batch(symbols, start_date, end_date, fetch_batch, cache_dir=CACHE_DIR):
+    start = to_timestamp(start_date)
+    end = to_timestamp(end_date)
+    # Today's bar is still moving, so never mark it (or anything later) as covered
+    today = to_timestamp(datetime.date.today())
+
+    # Group symbols that are missing exactly the same ranges so they share a download
+    coverage = {symbol: load_coverage(symbol, cache_dir) for symbol in symbols}
+    pending = {}
+    for symbol in symbols:
+        for gap in missing_ranges(coverage[symbol], start, end):
+            pending.setdefault(gap, []).append(symbol)
+
+    for (gap_start, gap_end), gap_symbols in pending.items():
+        try:
+            downloaded, failed = fetch_batch(gap_symbols, gap_start, gap_end)
+        except Exception:
+            continue
+        for symbol in gap_symbols:
+            if symbol in failed:
+                # The request for this symbol failed: leave the gap open so the next call retries it
+                continue
+            if symbol in downloaded:
+                write_cached(symbol, clean_download(downloaded[symbol]), cache_dir)
+            elif not coverage[symbol]:
+                # Unknown symbol with nothing cached yet: don't remember the empty answer
+                continue
+            covered_end = min(gap_end, today)
+            if gap_start < covered_end:
+                coverage[symbol].append((gap_start, covered_end))
+                save_coverage(symbol, coverage[symbol], cache_dir)
+
+    cached = {}
+    for symbol in symbols:
+        data = read_cached(symbol, start, end, cache_dir)
+        if not data.empty:
+            cached[symbol] = data
+    return cached
@@ -0,0 +1,95 @@
+import numpy as np
+
+from marketcache import CACHE_DIR, fetch_cached_batch
+from marketprovider import get_provider
+from orderbook import depth_metrics, simulate_order_books
+
+# Number of symbols sent to the provider in a single grouped download
+BATCH_SIZE = 50
+
+# Function to append the NSE suffix unless the symbol already names an exchange
+def normalize_ticker(ticker):
+    ticker = str(ticker).strip()
+    if ticker.endswith('.NS') or ticker.endswith('.BO'):
+        return ticker
+    return ticker + '.NS'
+
+# Depth columns added to every frame from the simulated order book
+DEPTH_COLUMNS = ['Bid_Volume', 'Offer_Volume', 'Depth_Imbalance', 'Top_Imbalance', 'Spread', 'Microprice']
+
+# Function to add simulated order-book depth to every frame of {ticker: frame} in one bulk pass;
+# `names` (default: the keys) seed each ticker's own random stream
+def attach_simulated_depth(market_data, names=None):
+    if not market_data:
+        return market_data
+    names = list(market_data) if names is None else list(names)
+    # Right-align each ticker by position, as attach_indicators does
+    length = max(len(data) for data in market_data.values())
+    close = np.full((length, len(market_data)), np.nan)
+    volume = np.zeros((length, len(market_data)))
+    for i, data in enumerate(market_data.values()):
+        close[length - len(data):, i] = data['Close'].to_numpy(dtype=float)
+        volume[length - len(data):, i] = data['Volume'].to_numpy(dtype=float)
+    metrics = depth_metrics(simulate_order_books(close, volume, names))
+    for i, data in enumerate(market_data.values()):
+        for name in DEPTH_COLUMNS:
+            values = metrics[name][length - len(data):, i]
+            if name in ('Bid_Volume', 'Offer_Volume'):
+                values = np.nan_to_num(values).astype(np.int64)
+            data[name] = values
+    return market_data
+
+# Function to simulate order-book depth for a single downloaded frame
+def add_simulated_depth(stock_data, ticker=''):
+    return attach_simulated_depth({ticker: stock_data})[ticker]
+
+# Function to download symbols from the provider in groups of batch_size
+def download_batch(symbols, start_date, end_date, batch_size=BATCH_SIZE, provider=None, failed=None):
+    provider = provider or get_provider()
+    downloaded = {}
+    for i in range(0, len(symbols), batch_size):
+        chunk = symbols[i:i + batch_size]
+        try:
+            downloaded.update(provider.download(chunk, start=start_date, end=end_date))
+        except Exception:
+            # Keep going with the other chunks, but let the caller know these symbols were never answered
+            if failed is not None:
+                failed.update(chunk)
+    return downloaded
+
+# Function to fetch symbols through the local cache (cache_dir=None downloads everything)
+def fetch_symbols(symbols, start_date, end_date, batch_size=BATCH_SIZE, provider=None, cache_dir=CACHE_DIR):
+    def fetch_batch(batch_symbols, batch_start, batch_end):
+        failed = set()
+        downloaded = download_batch(batch_symbols, batch_start, batch_end, batch_size, provider, failed)
+        return downloaded, failed
+
+    if cache_dir is None:
+        return download_batch(list(symbols), start_date, end_date, batch_size, provider)
+    return fetch_cached_batch(list(symbols), start_date, end_date, fetch_batch, cache_dir)
+
+# Function to fetch market data for one symbol exactly as given (e.g. IREDA.NS or ^NSEI)
+def fetch_market_data(ticker, start_date, end_date, provider=None, cache_dir=CACHE_DIR):
+    downloaded = fetch_symbols([ticker], start_date, end_date, provider=provider, cache_dir=cache_dir)
+    if ticker not in downloaded:
+        raise ValueError(f"No market data found for {ticker}")
+    return add_simulated_depth(downloaded[ticker], ticker)
+
+# Function to fetch many tickers with a small number of grouped provider downloads
+def fetch_market_data_batch(tickers, start_date, end_date, batch_size=BATCH_SIZE, provider=None, cache_dir=CACHE_DIR):
+    # Map each yfinance symbol back to the first ticker spelling that asked for it
+    symbols = {}
+    for ticker in tickers:
+        symbols.setdefault(normalize_ticker(ticker), ticker)
+    downloaded = fetch_symbols(symbols, start_date, end_date, batch_size, provider, cache_dir)
+
+    market_data = {}
+    failed = []
+    for symbol, ticker in symbols.items():
+        if symbol in downloaded:
+            market_data[ticker] = downloaded[symbol]
+        else:
+            failed.append(ticker)
+    # Seed every ticker's depth by its exchange symbol, so IREDA and IREDA.NS get the same book
+    attach_simulated_depth(market_data, [normalize_ticker(ticker) for ticker in market_data])
+    return market_data, failed
@@ -0,0 +1,208 @@
+import json
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from indicators import prefix_sums, rolling_mean
+from marketcache import CACHE_DIR, to_timestamp
+from screener import Rule, screen_panel
+from ttlcache import TTLCache
+
+# Columns stored in every yearly partition of the cache, read with one schema whatever pandas wrote
+LAKE_SCHEMA = pa.schema([
+    ('Date', pa.timestamp('ns')),
+    ('Open', pa.float64()),
+    ('High', pa.float64()),
+    ('Low', pa.float64()),
+    ('Close', pa.float64()),
+    ('Volume', pa.float64()),
+])
+# Schema of the all-symbol snapshots: the partition columns plus the symbol
+SNAPSHOT_SCHEMA = LAKE_SCHEMA.append(pa.field('Ticker', pa.string()))
+# Snapshots are read with the symbol as dictionary codes, which is what the pivot needs anyway
+SNAPSHOT_READ_SCHEMA = LAKE_SCHEMA.append(pa.field('Ticker', pa.dictionary(pa.int32(), pa.string())))
+SNAPSHOT_FORMAT = ds.ParquetFileFormat(read_options=ds.ParquetReadOptions(dictionary_columns=['Ticker']))
+# Partition field: the symbol is the directory name of each cached file
+TICKER_PARTITIONING = ds.DirectoryPartitioning(pa.schema([('Ticker', pa.string())]))
+# Directory (inside the cache) holding one cross-sectional snapshot file per year
+SNAPSHOT_DIR = '_lake'
+# Derived columns a query can name: SMA_<n> and Return_<n> (return over n sessions)
+DERIVED_PATTERN = re.compile(r'^(SMA|Return)_(\d+)$')
+
+# Loaded panels per (lake, date range), dropped as soon as any partition file changes
+panel_cache = TTLCache(ttl=3600, maxsize=16)
+# Serializes snapshot rebuilds, so a warm-up thread and a query never write the same file at once
+snapshot_lock = threading.Lock()
+
+# Function to list every symbol's partition files by year, with their modification times, in one walk
+def partition_index(cache_dir):
+    index = {}
+    if not os.path.isdir(cache_dir):
+        return index
+    with os.scandir(cache_dir) as symbols:
+        for symbol in symbols:
+            if not symbol.is_dir() or symbol.name == SNAPSHOT_DIR:
+                continue
+            with os.scandir(symbol.path) as partitions:
+                for partition in partitions:
+                    year, extension = os.path.splitext(partition.name)
+                    if extension == '.parquet' and year.isdigit():
+                        index.setdefault(int(year), []).append((partition.path, partition.stat().st_mtime))
+    return index
+
+# Function to fingerprint a set of partition files so a snapshot is rebuilt only after the cache changed
+def lake_signature(partitions):
+    return [len(partitions), max((mtime for _, mtime in partitions), default=0.0)]
+
+# Function to get the all-symbol snapshot of one year, rebuilding it from the per-symbol partitions
+# when they changed; scanning thousands of small files is slow, one file per year is not
+def year_snapshot(cache_dir, year, partitions=None):
+    if partitions is None:
+        partitions = partition_index(cache_dir).get(year, [])
+    if not partitions:
+        return None, None
+    signature = lake_signature(partitions)
+    snapshot_dir = os.path.join(cache_dir, SNAPSHOT_DIR)
+    path = os.path.join(snapshot_dir, f"{year}.parquet")
+    meta_path = os.path.join(snapshot_dir, f"{year}.json")
+    with snapshot_lock:
+        if os.path.exists(path) and os.path.exists(meta_path):
+            with open(meta_path) as f:
+                if json.load(f) == signature:
+                    return path, signature
+
+        dataset = ds.dataset(sorted(path for path, _ in partitions), schema=SNAPSHOT_SCHEMA, format='parquet',
+                             partition_base_dir=cache_dir, partitioning=TICKER_PARTITIONING)
+        table = dataset.to_table().sort_by([('Ticker', 'ascending'), ('Date', 'ascending')])
+        os.makedirs(snapshot_dir, exist_ok=True)
+        pq.write_table(table, path + '.tmp')
+        os.replace(path + '.tmp', path)
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump(signature, f)
+        os.replace(meta_path + '.tmp', meta_path)
+    return path, signature
+
+# Dense (dates x tickers) panels read from the Parquet cache
+class LakePanel:
+    def __init__(self, dates, tickers, columns):
+        self.dates = dates
+        self.tickers = tickers
+        self.columns = columns
+
+    # Function to get a stored or derived column (SMA_<n>, Return_<n>, Return) as a 2-D array
+    def column(self, name):
+        if name not in self.columns:
+            self.columns[name] = self.derive(name)
+        return self.columns[name]
+
+    def derive(self, name):
+        close = self.columns['Close']
+        if name == 'Return':
+            name = 'Return_1'
+        match = DERIVED_PATTERN.match(name)
+        if match is None:
+            raise ValueError(f"Unknown column in query: {name}")
+        kind, window = match.group(1), int(match.group(2))
+        if kind == 'SMA':
+            return rolling_mean(prefix_sums(close), window)
+        shifted = np.full(close.shape, np.nan)
+        shifted[window:] = close[:-window]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return close / shifted - 1
+
+    # Function to wrap a column as a (dates x tickers) DataFrame
+    def frame(self, name):
+        return pd.DataFrame(self.column(name), index=self.dates, columns=self.tickers, copy=False)
+
+# Function to read the cache for [start, end) into dense (dates x tickers) panels with one Arrow scan
+def load_lake(start_date, end_date, cache_dir=CACHE_DIR, cache=panel_cache):
+    start, end = to_timestamp(start_date), to_timestamp(end_date)
+    index = partition_index(cache_dir)
+    snapshots = [year_snapshot(cache_dir, year, index.get(year, [])) for year in range(start.year, end.year + 1)]
+    files = [path for path, _ in snapshots if path is not None]
+    key = (os.path.abspath(cache_dir), start, end)
+    signature = [signature for _, signature in snapshots]
+    cached = cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    if not files:
+        raise ValueError(f"No cached market data between {start.date()} and {end.date()} in {cache_dir}")
+    dataset = ds.dataset(files, schema=SNAPSHOT_READ_SCHEMA, format=SNAPSHOT_FORMAT)
+    date_filter = (ds.field('Date') >= pa.scalar(start, pa.timestamp('ns'))) & \
+                  (ds.field('Date') < pa.scalar(end, pa.timestamp('ns')))
+    table = dataset.to_table(columns=['Date', 'Ticker', 'Open', 'High', 'Low', 'Close', 'Volume'], filter=date_filter)
+
+    # Pivot the long table to (dates x tickers) with integer codes instead of a pandas pivot
+    symbols = table.unify_dictionaries().column('Ticker')
+    tickers = pd.Index(symbols.chunk(0).dictionary.to_pylist() if symbols.num_chunks else [], name='Ticker')
+    ticker_codes = np.concatenate([chunk.indices.to_numpy() for chunk in symbols.chunks])
+    order = np.argsort(tickers.to_numpy())
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    tickers = tickers[order]
+    date_values = table.column('Date').to_numpy()
+    dates = np.sort(pc.unique(table.column('Date')).to_numpy())
+    cells = np.searchsorted(dates, date_values) * len(tickers) + rank[ticker_codes]
+
+    columns = {}
+    for name in ('Open', 'High', 'Low', 'Close', 'Volume'):
+        panel = np.full((len(dates), len(tickers)), np.nan)
+        panel.ravel()[cells] = table.column(name).to_numpy()
+        columns[name] = panel
+    lake = LakePanel(pd.DatetimeIndex(dates, name='Date'), tickers, columns)
+    cache.put(key, (signature, lake))
+    return lake
+
+# Function to load a date range in a background thread, so the first query of a session finds the
+# snapshots built and the panels cached instead of paying the cold load (about a second on a big cache)
+def warm_lake(start_date, end_date, cache_dir=CACHE_DIR, cache=panel_cache):
+    def load():
+        try:
+            load_lake(start_date, end_date, cache_dir, cache)
+        except (OSError, ValueError, pa.ArrowException):
+            # Nothing cached yet (or unreadable): the query reports it when it runs
+            pass
+
+    thread = threading.Thread(target=load, name='lake-warmup', daemon=True)
+    thread.start()
+    return thread
+
+# Function to rank the top (or bottom) n tickers by daily return on every date of the panel
+def top_movers(lake, n=20, losers=False, days=None):
+    returns = lake.column('Return_1')
+    dates = lake.dates
+    if days is not None:
+        returns, dates = returns[-days:], dates[-days:]
+    n = min(n, returns.shape[1])
+    if n <= 0 or len(dates) == 0:
+        return pd.DataFrame({'Date': np.asarray(dates[:0]), 'Rank': np.array([], dtype=int),
+                             'Ticker': np.array([], dtype=object), 'Return': np.array([], dtype=float)})
+    # NaN (not traded) sinks to the bottom in both directions
+    keyed = np.where(np.isnan(returns), np.inf, returns if losers else -returns)
+    picks = np.argpartition(keyed, n - 1, axis=1)[:, :n]
+    picked = np.take_along_axis(keyed, picks, axis=1)
+    order = np.argsort(picked, axis=1, kind='stable')
+    picks = np.take_along_axis(picks, order, axis=1)
+    values = np.take_along_axis(returns, picks, axis=1)
+    result = pd.DataFrame({
+        'Date': np.repeat(dates, n),
+        'Rank': np.tile(np.arange(1, n + 1), len(dates)),
+        'Ticker': lake.tickers.to_numpy()[picks.ravel()],
+        'Return': values.ravel(),
+    })
+    result = result[result['Return'].notna()]
+    return result.sort_values(['Date', 'Rank'], ascending=[False, True], kind='stable').reset_index(drop=True)
+
+# Function to run a screener rule (e.g. "SMA_50 crosses SMA_200") over the lake panels
+def query_rule(lake, rule, lookback=None):
+    rule = rule if isinstance(rule, Rule) else Rule(rule)
+    panels = {name: lake.frame(name) for name in rule.columns}
+    return screen_panel(panels, rule, lookback)
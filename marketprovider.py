@@ -0,0 +1,176 @@
+import os
+import time
+import zlib
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# yfinance period strings understood by the local provider
+PERIODS = {
+    '1d': pd.DateOffset(days=1), '5d': pd.DateOffset(days=5),
+    '1mo': pd.DateOffset(months=1), '3mo': pd.DateOffset(months=3), '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1), '2y': pd.DateOffset(years=2), '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+# Function to split a grouped yf.download result into one OHLCV frame per symbol
+def split_batch(raw, symbols):
+    frames = {}
+    if raw is None or raw.empty:
+        return frames
+    if not isinstance(raw.columns, pd.MultiIndex):
+        # Older yfinance returns flat columns when only one symbol was requested
+        if len(symbols) == 1:
+            frames[symbols[0]] = raw.dropna(how='all')
+        return frames
+    available = set(raw.columns.get_level_values(0))
+    for symbol in symbols:
+        if symbol not in available:
+            continue
+        # Rows are the union of all dates in the batch, so drop the ones this symbol never traded
+        frame = raw[symbol].dropna(how='all')
+        frame.columns.name = None
+        if not frame.empty:
+            frames[symbol] = frame.copy()
+    return frames
+
+# Interface every market data source implements; symbols are passed exactly as yfinance spells them
+class MarketDataProvider(ABC):
+    # Function to download daily OHLCV for many symbols as {symbol: frame}; end is exclusive
+    @abstractmethod
+    def download(self, symbols, start=None, end=None, period=None):
+        raise NotImplementedError
+
+    # Function to read the fundamentals dictionary (Ticker.info) for one symbol
+    @abstractmethod
+    def info(self, symbol):
+        raise NotImplementedError
+
+# Provider backed by the live yfinance API
+class YFinanceProvider(MarketDataProvider):
+    def download(self, symbols, start=None, end=None, period=None):
+        symbols = list(symbols)
+        if period is not None:
+            raw = yf.download(symbols, period=period, group_by='ticker', progress=False)
+        else:
+            raw = yf.download(symbols, start=start, end=end, group_by='ticker', progress=False)
+        return split_batch(raw, symbols)
+
+    def info(self, symbol):
+        return yf.Ticker(symbol).info or {}
+
+# Deterministic offline provider: recorded bars from a Parquet fixture and/or seeded synthetic bars
+class LocalProvider(MarketDataProvider):
+    SYNTHETIC_START = '2000-01-03'
+
+    def __init__(self, path=None, latency=0.0, per_symbol_latency=0.0, synthetic=None, end_date=None):
+        self.recorded = {}
+        if path is not None:
+            fixture = pd.read_parquet(path)
+            for symbol, rows in fixture.groupby('Ticker'):
+                self.recorded[symbol] = rows.set_index('Date')[OHLCV_COLUMNS].sort_index()
+        # Without a fixture every symbol is synthesized; with one only on request
+        self.synthetic = path is None if synthetic is None else synthetic
+        self.latency = latency
+        self.per_symbol_latency = per_symbol_latency
+        self.end_date = pd.Timestamp(end_date or pd.Timestamp.today()).normalize()
+        self.calendar = None
+        self.generated = {}
+        self.calls = 0
+
+    # Function to build a reproducible random-walk history for a symbol, seeded by its name
+    def synthetic_history(self, symbol):
+        if symbol not in self.generated:
+            if self.calendar is None:
+                self.calendar = pd.bdate_range(self.SYNTHETIC_START, self.end_date, name='Date')
+            dates = self.calendar
+            rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+            close = rng.uniform(20, 2000) * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))
+            self.generated[symbol] = pd.DataFrame({
+                'Open': close * (1 + rng.normal(0, 0.005, len(dates))),
+                'High': close * (1 + np.abs(rng.normal(0, 0.01, len(dates)))),
+                'Low': close * (1 - np.abs(rng.normal(0, 0.01, len(dates)))),
+                'Close': close,
+                'Volume': rng.integers(10000, 1000000, len(dates)),
+            }, index=dates)
+        return self.generated[symbol]
+
+    # Function to look up a symbol's full history, or None when it is unknown
+    def history(self, symbol):
+        if symbol in self.recorded:
+            return self.recorded[symbol]
+        if self.synthetic:
+            return self.synthetic_history(symbol)
+        return None
+
+    def download(self, symbols, start=None, end=None, period=None):
+        symbols = list(symbols)
+        self.calls += 1
+        # Simulate the round trip a real request would cost
+        time.sleep(self.latency + self.per_symbol_latency * len(symbols))
+        frames = {}
+        for symbol in symbols:
+            history = self.history(symbol)
+            if history is None or history.empty:
+                continue
+            if period is not None:
+                stop = history.index[-1] + pd.Timedelta(days=1)
+                begin = history.index[0] if period == 'max' else stop - PERIODS[period]
+            else:
+                begin = pd.Timestamp(start) if start is not None else history.index[0]
+                stop = pd.Timestamp(end) if end is not None else history.index[-1] + pd.Timedelta(days=1)
+            frame = history[(history.index >= begin) & (history.index < stop)]
+            if not frame.empty:
+                frames[symbol] = frame.copy()
+        return frames
+
+    def info(self, symbol):
+        history = self.history(symbol)
+        if history is None or history.empty:
+            return {}
+        last_year = history['Close'].iloc[-252:]
+        rng = np.random.default_rng(zlib.crc32(symbol.encode()) + 1)
+        return {
+            'marketCap': int(history['Close'].iloc[-1] * rng.integers(10 ** 7, 10 ** 9)),
+            'fiftyTwoWeekHigh': float(last_year.max()),
+            'fiftyTwoWeekLow': float(last_year.min()),
+            'trailingPE': float(rng.uniform(5, 80)),
+            'dividendYield': float(rng.uniform(0, 0.05)),
+            'beta': float(rng.uniform(0.3, 1.8)),
+        }
+
+# Function to write {symbol: frame} as a long (Date, Ticker, OHLCV) Parquet fixture for LocalProvider
+def save_fixture(frames, path):
+    rows = []
+    for symbol, frame in frames.items():
+        frame = frame[OHLCV_COLUMNS].copy()
+        frame.index.name = 'Date'
+        rows.append(frame.reset_index().assign(Ticker=symbol))
+    fixture = pd.concat(rows, ignore_index=True)[['Date', 'Ticker'] + OHLCV_COLUMNS]
+    fixture.to_parquet(path, index=False)
+    return fixture
+
+# Function to build the provider selected by MARKET_DATA_PROVIDER (yfinance or local)
+def provider_from_env():
+    if os.environ.get('MARKET_DATA_PROVIDER', 'yfinance') == 'local':
+        return LocalProvider(path=os.environ.get('MARKET_DATA_FIXTURE') or None,
+                             latency=float(os.environ.get('MARKET_DATA_LATENCY', 0)))
+    return YFinanceProvider()
+
+default_provider = None
+
+# Function to get the process-wide provider, creating it on first use
+def get_provider():
+    global default_provider
+    if default_provider is None:
+        default_provider = provider_from_env()
+    return default_provider
+
+# Function to replace the process-wide provider (e.g. with a LocalProvider in benchmarks)
+def set_provider(provider):
+    global default_provider
+    default_provider = provider
@@ -1,55 +1,29 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 import pandas as pd
 import plotly.express as px
 import plotly.io as pio
+from payroll import bulk_payroll, payroll_format, spool_upload
+from taxengine import regime_table
+from taxfigures import FigureTemplate
+from taxsensitivity import sensitivity_request
 
 app = Flask(__name__)
 
-# Tax slab rates for Old Regime
-old_tax_slabs = [
-    (250000, 0.00),
-    (500000, 0.05),
-    (1000000, 0.20),
-    (float('inf'), 0.30)
-]
-
-# Tax slab rates for New Regime (Before Budget 2023)
-new_tax_slabs_before_2023 = [
-    (250000, 0.00),
-    (500000, 0.05),
-    (750000, 0.10),
-    (1000000, 0.15),
-    (1250000, 0.20),
-    (1500000, 0.25),
-    (float('inf'), 0.30)
-]
-
-# Tax slab rates for New Regime (After Budget 2023)
-new_tax_slabs_after_2023 = [
-    (300000, 0.00),
-    (600000, 0.05),
-    (900000, 0.10),
-    (1200000, 0.15),
-    (1500000, 0.20),
-    (float('inf'), 0.30)
-]
-
-def calculate_tax(income, tax_slabs):
-    tax = 0
-    previous_slab_limit = 0
+# Regimes this calculator offers, and the one used when a request names none (or another one)
+offered_tables = {regime: regime_table(regime) for regime in ('old', 'new_before_2023', 'new_after_2023')}
+default_regime = 'new_after_2023'
+
+# Function to pick the compiled slab table for a regime offered by this calculator
+def select_table(regime):
+    return offered_tables.get(regime, offered_tables[default_regime])
+
+def calculate_tax(income, regime):
+    tax_table = select_table(regime)
     effective_tax = []
-    for slab_limit, rate in tax_slabs:
-        if income > slab_limit:
-            taxable_income = slab_limit - previous_slab_limit
-            tax += taxable_income * rate
-            effective_tax.append((slab_limit, rate * 100, taxable_income * rate))
-            previous_slab_limit = slab_limit
-        else:
-            taxable_income = income - previous_slab_limit
-            tax += taxable_income * rate
-            effective_tax.append((income, rate * 100, taxable_income * rate))
-            break
-    return tax, effective_tax
+    for slab_limit, rate, _, slab_tax in tax_table.breakdown(income):
+        # The slab the income ends in is reported at the income itself
+        effective_tax.append((slab_limit if income > slab_limit else income, rate * 100, slab_tax))
+    return tax_table.tax(income), effective_tax
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
@@ -59,19 +33,11 @@ def index():
             income = float(data['income'])
             std_deduction = float(data.get('std_deduction', 50000))
             nps_contribution = float(data.get('nps_contribution', 50000))
-            regime = data.get('regime', 'new_after_2023')  # default to new regime after 2023
-
-            # Select tax slabs based on regime
-            if regime == 'old':
-                tax_slabs = old_tax_slabs
-            elif regime == 'new_before_2023':
-                tax_slabs = new_tax_slabs_before_2023
-            else:
-                tax_slabs = new_tax_slabs_after_2023
+            regime = data.get('regime', default_regime)
 
             # Adjust income based on standard deduction and NPS contribution
             adjusted_income = income - std_deduction - nps_contribution
-            tax, effective_tax = calculate_tax(adjusted_income, tax_slabs)
+            tax, effective_tax = calculate_tax(adjusted_income, regime)
 
             tax_summary = [{"range": f"Up to ₹{slab}", "rate": rate, "effectiveTax": f"₹{tax:.2f}"} for slab, rate, tax in effective_tax]
             total_tax = sum(tax for _, _, tax in effective_tax)
@@ -87,6 +53,30 @@ def index():
             return jsonify(error="Invalid input amount"), 400
     return render_template('newtaxcal.html')
 
+# Slab labels per regime offered by this calculator
+regime_labels = {
+    'old': ["Up to ₹2.5 lakhs", "₹2.5 lakhs to ₹5 lakhs", "₹5 lakhs to ₹10 lakhs", "Above ₹10 lakhs"],
+    'new_before_2023': ["Up to ₹2.5 lakhs", "₹2.5 lakhs to ₹5 lakhs", "₹5 lakhs to ₹7.5 lakhs",
+                        "₹7.5 lakhs to ₹10 lakhs", "₹10 lakhs to ₹12.5 lakhs", "₹12.5 lakhs to ₹15 lakhs", "Above ₹15 lakhs"],
+    'new_after_2023': ["Up to ₹3 lakhs", "₹3 lakhs to ₹6 lakhs", "₹6 lakhs to ₹9 lakhs",
+                       "₹9 lakhs to ₹12 lakhs", "₹12 lakhs to ₹15 lakhs", "Above ₹15 lakhs"],
+}
+
+# Figure skeletons for /visualize, built and serialized once; requests only patch in their numbers
+slab_figures = {
+    regime: FigureTemplate(px.bar(pd.DataFrame({"Income Range": labels, "Effective Tax": [0.0] * len(labels)}),
+                                  x="Income Range", y="Effective Tax", title="Effective Tax per Income Range",
+                                  labels={"Effective Tax": "Tax Amount in ₹"}), fields=('y',))
+    for regime, labels in regime_labels.items()
+}
+rate_figure = FigureTemplate(px.bar(pd.DataFrame({"Effective Tax Rate (%)": [0.0]}), y="Effective Tax Rate (%)",
+                                    title="Effective Tax Rate", labels={"Effective Tax Rate (%)": "Effective Tax Rate (%)"}),
+                             fields=('y',))
+deduction_types = ["Income", "Standard Deduction", "NPS Contribution", "Taxable Income"]
+deductions_figure = FigureTemplate(px.bar(pd.DataFrame({"Type": deduction_types, "Amount (₹)": [0.0] * 4}), x="Type",
+                                          y="Amount (₹)", title="Impact of Deductions", labels={"Amount (₹)": "Amount in ₹"}),
+                                   fields=('y',))
+
 @app.route('/visualize', methods=['POST'])
 def visualize():
     try:
@@ -94,57 +84,53 @@ def visualize():
         income = float(data['income'])
         std_deduction = float(data.get('std_deduction', 50000))
         nps_contribution = float(data.get('nps_contribution', 50000))
-        regime = data.get('regime', 'new_after_2023')  # default to new regime after 2023
-
-        # Select tax slabs based on regime
-        if regime == 'old':
-            tax_slabs = old_tax_slabs
-            ranges_labels = ["Up to ₹2.5 lakhs", "₹2.5 lakhs to ₹5 lakhs", "₹5 lakhs to ₹10 lakhs", "Above ₹10 lakhs"]
-        elif regime == 'new_before_2023':
-            tax_slabs = new_tax_slabs_before_2023
-            ranges_labels = ["Up to ₹2.5 lakhs", "₹2.5 lakhs to ₹5 lakhs", "₹5 lakhs to ₹7.5 lakhs", 
-                             "₹7.5 lakhs to ₹10 lakhs", "₹10 lakhs to ₹12.5 lakhs", "₹12.5 lakhs to ₹15 lakhs", "Above ₹15 lakhs"]
-        else:
-            tax_slabs = new_tax_slabs_after_2023
-            ranges_labels = ["Up to ₹3 lakhs", "₹3 lakhs to ₹6 lakhs", "₹6 lakhs to ₹9 lakhs", 
-                             "₹9 lakhs to ₹12 lakhs", "₹12 lakhs to ₹15 lakhs", "Above ₹15 lakhs"]
+        regime = data.get('regime', default_regime)
+        if regime not in offered_tables:
+            regime = default_regime
 
         adjusted_income = income - std_deduction - nps_contribution
-        tax, effective_tax = calculate_tax(adjusted_income, tax_slabs)
 
-        data = {
-            "Income Range": ranges_labels,
-            "Tax Rate": [rate for _, rate, _ in effective_tax],
-            "Effective Tax": [tax for _, _, tax in effective_tax]
-        }
-
-        df = pd.DataFrame(data)
-        fig = px.bar(df, x="Income Range", y="Effective Tax", title="Effective Tax per Income Range", labels={"Effective Tax": "Tax Amount in ₹"})
-        graphJSON = pio.to_json(fig)
+        # One bar per slab label, including the slabs the income does not reach
+        effective_tax = offered_tables[regime].slab_taxes(adjusted_income).tolist()
+        graphJSON = slab_figures[regime].render(y=effective_tax)
 
         # Effective Tax Rate Visualization
-        total_effective_tax = sum([tax for _, _, tax in effective_tax])
+        total_effective_tax = sum(effective_tax)
         effective_tax_rate = (total_effective_tax / adjusted_income) * 100 if adjusted_income > 0 else 0
-        effective_tax_rate_data = {
-            "Effective Tax Rate (%)": [effective_tax_rate]
-        }
-        df_rate = pd.DataFrame(effective_tax_rate_data)
-        fig_rate = px.bar(df_rate, y="Effective Tax Rate (%)", title="Effective Tax Rate", labels={"Effective Tax Rate (%)": "Effective Tax Rate (%)"})
-        graphJSON_rate = pio.to_json(fig_rate)
+        graphJSON_rate = rate_figure.render(y=[effective_tax_rate])
 
         # Deductions Impact Visualization
-        deduction_data = {
-            "Type": ["Income", "Standard Deduction", "NPS Contribution", "Taxable Income"],
-            "Amount (₹)": [income, -std_deduction, -nps_contribution, adjusted_income]
-        }
-        df_deductions = pd.DataFrame(deduction_data)
-        fig_deductions = px.bar(df_deductions, x="Type", y="Amount (₹)", title="Impact of Deductions", labels={"Amount (₹)": "Amount in ₹"})
-        graphJSON_deductions = pio.to_json(fig_deductions)
+        graphJSON_deductions = deductions_figure.render(y=[income, -std_deduction, -nps_contribution, adjusted_income])
 
         return jsonify(graphJSON=graphJSON, graphJSON_rate=graphJSON_rate, graphJSON_deductions=graphJSON_deductions)
     except (ValueError, KeyError) as e:
         return jsonify(error="Invalid input amount"), 400
 
+@app.route('/bulk', methods=['POST'])
+def bulk():
+    # A multipart "file" upload or the raw request body; ?format= and ?output= override csv/ndjson
+    try:
+        upload = request.files.get('file')
+        if upload is not None:
+            fmt = payroll_format(request.args.get('format'), upload.filename, upload.mimetype)
+            # Werkzeug closes the upload when this view returns, so the stream reads its own copy
+            stream = spool_upload(upload.stream)
+        else:
+            stream = request.stream
+            fmt = payroll_format(request.args.get('format'), content_type=request.content_type)
+        output, mimetype = bulk_payroll(stream, fmt, request.args.get('output'), offered_tables, default_regime,
+                                        owned=upload is not None)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return Response(stream_with_context(output), mimetype=mimetype)
+
+@app.route('/sensitivity', methods=['GET'])
+def sensitivity():
+    try:
+        return jsonify(sensitivity_request(request.args, offered_tables))
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
 @app.route('/history', methods=['POST'])
 def history():
     try:
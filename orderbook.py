@@ -0,0 +1,90 @@
+import zlib
+
+import numpy as np
+
+from indicators import ewm_blocked
+
+# Price levels simulated on each side of the book
+DEPTH_LEVELS = 5
+# NSE tick size
+TICK_SIZE = 0.05
+# Base seed mixed with each ticker's name, so every ticker has its own reproducible stream
+DEPTH_SEED = 42
+# Persistence of the bid/ask imbalance from one bar to the next
+IMBALANCE_PERSISTENCE = 0.8
+# Share of a bar's traded volume resting at the best level of each side
+TOP_LEVEL_SHARE = 0.002
+
+# Function to create an independent random stream for a ticker, unaffected by any other ticker
+def ticker_generator(ticker, seed=DEPTH_SEED):
+    return np.random.default_rng([seed, zlib.crc32(str(ticker).encode())])
+
+# Function to draw each ticker's noise from its own stream, right-aligned into one (bars x tickers x k) block
+def ticker_noise(tickers, lengths, n_bars, k, seed=DEPTH_SEED):
+    noise = np.zeros((n_bars, len(tickers), k))
+    for i, (ticker, length) in enumerate(zip(tickers, lengths)):
+        noise[n_bars - length:, i] = ticker_generator(ticker, seed).standard_normal((length, k))
+    return noise
+
+# Function to simulate an L2 book for a (bars x tickers) close/volume panel in bulk.
+# Tickers with shorter histories are right-aligned with NaN before their first bar; each ticker's
+# book depends only on its own name and bars, so it is the same alone or in any batch.
+def simulate_order_books(close, volume, tickers, levels=DEPTH_LEVELS, tick=TICK_SIZE, seed=DEPTH_SEED):
+    close = np.asarray(close, dtype=float)
+    volume = np.nan_to_num(np.asarray(volume, dtype=float))
+    n_bars, n_tickers = close.shape
+    listed = ~np.isnan(close)
+    lengths = n_bars - listed.argmax(axis=0)
+    lengths[~listed.any(axis=0)] = 0
+
+    # Per bar: spread, imbalance shock, then one size shock per level and side
+    noise = ticker_noise(tickers, lengths, n_bars, 2 + 2 * levels, seed)
+
+    # Spread of 1-4 ticks, wider for bars with bigger shocks
+    spread_ticks = 1 + np.minimum(np.floor(np.abs(noise[:, :, 0]) * 1.5), 3)
+
+    # Imbalance is an AR(1) process started from zero: an EWM over a leading zero row
+    persistence = IMBALANCE_PERSISTENCE
+    shocks = np.vstack([np.zeros((1, n_tickers)), noise[:, :, 1]])
+    imbalance = ewm_blocked(shocks, np.array([[1 - persistence]]))[0, 1:]
+    imbalance *= np.sqrt(1 - persistence ** 2) / (1 - persistence) * 0.5
+
+    # Resting size grows with depth; bids get heavier when imbalance is positive
+    depth = 1 + 0.5 * np.arange(levels)
+    base = np.maximum(volume * TOP_LEVEL_SHARE, 1.0)[:, :, None] * depth
+    bid_sizes = np.round(base * np.exp(0.35 * noise[:, :, 2:2 + levels] + imbalance[:, :, None]))
+    ask_sizes = np.round(base * np.exp(0.35 * noise[:, :, 2 + levels:] - imbalance[:, :, None]))
+
+    # Quotes straddle the close on the tick grid, one tick apart per level; work in whole ticks
+    # and round once so spreads come out as exact multiples of the tick
+    mid_ticks = np.round(close / tick)
+    best_bid_ticks = mid_ticks - spread_ticks // 2
+    steps = np.arange(levels)
+    bid_prices = np.round((best_bid_ticks[:, :, None] - steps) * tick, 4)
+    ask_prices = np.round(((best_bid_ticks + spread_ticks)[:, :, None] + steps) * tick, 4)
+
+    unlisted = ~listed
+    for array in (bid_prices, ask_prices, bid_sizes, ask_sizes):
+        array[unlisted] = np.nan
+    return {
+        'bid_prices': bid_prices,
+        'ask_prices': ask_prices,
+        'bid_sizes': bid_sizes,
+        'ask_sizes': ask_sizes,
+    }
+
+# Function to summarize a simulated book per bar: total depth per side, imbalance, spread, microprice
+def depth_metrics(book):
+    bid_depth = book['bid_sizes'].sum(axis=-1)
+    ask_depth = book['ask_sizes'].sum(axis=-1)
+    best_bid, best_ask = book['bid_prices'][..., 0], book['ask_prices'][..., 0]
+    bid_size, ask_size = book['bid_sizes'][..., 0], book['ask_sizes'][..., 0]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'Bid_Volume': bid_depth,
+            'Offer_Volume': ask_depth,
+            'Depth_Imbalance': (bid_depth - ask_depth) / (bid_depth + ask_depth),
+            'Top_Imbalance': (bid_size - ask_size) / (bid_size + ask_size),
+            'Spread': np.round(best_ask - best_bid, 4),
+            'Microprice': (best_ask * bid_size + best_bid * ask_size) / (bid_size + ask_size),
+        }
@@ -0,0 +1,225 @@
+import numpy as np
+
+from indicators import ewm_blocked
+
+# Numba is optional: without it the smoothing runs as NumPy block products and the
+# inherently sequential kernels (SAR, Supertrend) run as plain Python loops
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda function: function
+
+# Column names added by calculate_path_indicators
+PATH_INDICATOR_COLUMNS = ['RSI_Wilder', 'ATR_14', 'PSAR', 'Supertrend', 'Supertrend_Direction']
+
+# Kernel: Wilder smoothing seeded with the simple mean of the first `period` values from `start`
+@njit(cache=True)
+def wilder_smooth_loop(values, period, start):
+    result = np.full(len(values), np.nan)
+    if len(values) < start + period:
+        return result
+    average = 0.0
+    for i in range(start, start + period):
+        average += values[i]
+    average /= period
+    result[start + period - 1] = average
+    for i in range(start + period, len(values)):
+        average = (average * (period - 1) + values[i]) / period
+        result[i] = average
+    return result
+
+# Function to apply Wilder smoothing with NumPy when Numba is unavailable
+def wilder_smooth_numpy(values, period, start):
+    result = np.full(len(values), np.nan)
+    if len(values) < start + period:
+        return result
+    seed_at = start + period - 1
+    # Wilder smoothing is an EWM with alpha = 1/period started from the seed mean
+    series = values[seed_at:].astype(float).copy()
+    series[0] = values[start:start + period].mean()
+    result[seed_at:] = ewm_blocked(series[:, None], np.array([[1.0 / period]]))[0, :, 0]
+    return result
+
+# Function to run a kernel on the bars where every input is present and carry its output over the gaps,
+# the way the panel engine's EWMs carry through missing bars. Returns one full-length array per output
+def skip_gaps(kernel, columns, *args):
+    valid = np.ones(len(columns[0]), dtype=bool)
+    for column in columns:
+        valid &= ~np.isnan(column)
+    if valid.all():
+        outputs = kernel(*columns, *args)
+        return outputs if isinstance(outputs, tuple) else (outputs,)
+    outputs = kernel(*(column[valid] for column in columns), *args)
+    # Index of the latest present bar at or before each bar (-1 before the first one)
+    latest = np.maximum.accumulate(np.where(valid, np.arange(len(valid)), -1))
+    filled = []
+    for output in outputs if isinstance(outputs, tuple) else (outputs,):
+        full = np.full(len(valid), np.nan)
+        full[valid] = output
+        filled.append(np.where(latest >= 0, full[np.maximum(latest, 0)], np.nan))
+    return tuple(filled)
+
+# Function to pick a compiled kernel, or its plain Python version when Numba is off (or switched off)
+def kernel_function(loop):
+    return loop if NUMBA_AVAILABLE else getattr(loop, 'py_func', loop)
+
+# Function to pick the Wilder smoothing backend; missing values are skipped and the average carried over them
+def wilder_smooth(values, period, start=0):
+    values = np.asarray(values, dtype=float)
+    # `start` counts bars of the full series, so translate it to the gap-free one
+    start = int(np.count_nonzero(~np.isnan(values[:start])))
+
+    def smooth(present):
+        if NUMBA_AVAILABLE:
+            return wilder_smooth_loop(present, period, start)
+        return wilder_smooth_numpy(present, period, start)
+
+    return skip_gaps(smooth, [values])[0]
+
+# Function to calculate Wilder's RSI (the smoothing used by most charting packages)
+def wilder_rsi(close, period=14):
+    close = np.asarray(close, dtype=float)
+    delta = np.zeros(len(close))
+    delta[1:] = np.diff(close)
+    # The first change is undefined, so smoothing starts from the second bar
+    avg_gain = wilder_smooth(np.maximum(delta, 0.0), period, start=1)
+    avg_loss = wilder_smooth(np.maximum(-delta, 0.0), period, start=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+# Function to calculate the true range of each bar
+def true_range(high, low, close):
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    previous_close = np.empty(len(close))
+    previous_close[0] = np.nan
+    previous_close[1:] = close[:-1]
+    # fmax ignores the missing previous close of the first bar (and stays NaN for a missing bar)
+    return np.fmax(high - low, np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)))
+
+# Function to calculate the Average True Range with Wilder smoothing
+def average_true_range(high, low, close, period=14):
+    return wilder_smooth(true_range(high, low, close), period)
+
+# Kernel: Wilder's Parabolic SAR
+@njit(cache=True)
+def parabolic_sar_loop(high, low, step, max_step):
+    n = len(high)
+    result = np.full(n, np.nan)
+    if n < 2:
+        return result
+    rising = high[1] >= high[0]
+    extreme = high[0] if rising else low[0]
+    sar = low[0] if rising else high[0]
+    factor = step
+    result[0] = sar
+    for i in range(1, n):
+        sar = sar + factor * (extreme - sar)
+        if rising:
+            # SAR may not move above the two previous lows
+            sar = min(sar, low[i - 1])
+            if i > 1:
+                sar = min(sar, low[i - 2])
+            if low[i] < sar:
+                rising = False
+                sar = extreme
+                extreme = low[i]
+                factor = step
+            elif high[i] > extreme:
+                extreme = high[i]
+                factor = min(factor + step, max_step)
+        else:
+            sar = max(sar, high[i - 1])
+            if i > 1:
+                sar = max(sar, high[i - 2])
+            if high[i] > sar:
+                rising = True
+                sar = extreme
+                extreme = high[i]
+                factor = step
+            elif low[i] < extreme:
+                extreme = low[i]
+                factor = min(factor + step, max_step)
+        result[i] = sar
+    return result
+
+# Kernel: Supertrend line and direction (+1 up, -1 down) from precomputed ATR
+@njit(cache=True)
+def supertrend_loop(high, low, close, atr, multiplier):
+    n = len(close)
+    line = np.full(n, np.nan)
+    direction = np.full(n, np.nan)
+    start = -1
+    for i in range(n):
+        if atr[i] == atr[i]:
+            start = i
+            break
+    if start < 0:
+        return line, direction
+    upper = (high[start] + low[start]) / 2 + multiplier * atr[start]
+    lower = (high[start] + low[start]) / 2 - multiplier * atr[start]
+    trend = 1.0 if close[start] > upper else -1.0
+    line[start] = lower if trend > 0 else upper
+    direction[start] = trend
+    for i in range(start + 1, n):
+        middle = (high[i] + low[i]) / 2
+        basic_upper = middle + multiplier * atr[i]
+        basic_lower = middle - multiplier * atr[i]
+        # Bands only tighten while price stays on their side
+        if basic_upper < upper or close[i - 1] > upper:
+            next_upper = basic_upper
+        else:
+            next_upper = upper
+        if basic_lower > lower or close[i - 1] < lower:
+            next_lower = basic_lower
+        else:
+            next_lower = lower
+        if close[i] > upper:
+            trend = 1.0
+        elif close[i] < lower:
+            trend = -1.0
+        upper = next_upper
+        lower = next_lower
+        line[i] = lower if trend > 0 else upper
+        direction[i] = trend
+    return line, direction
+
+# Function to prepare kernel inputs: arrays for Numba, lists for the (much faster) pure-Python loop
+def kernel_input(values):
+    values = np.asarray(values, dtype=float)
+    return values if NUMBA_AVAILABLE else values.tolist()
+
+# Function to calculate the Parabolic SAR; bars missing a high or low are skipped and the SAR carried over them
+def parabolic_sar(high, low, step=0.02, max_step=0.2):
+    def sar(high, low):
+        return kernel_function(parabolic_sar_loop)(kernel_input(high), kernel_input(low), step, max_step)
+
+    return skip_gaps(sar, [np.asarray(high, dtype=float), np.asarray(low, dtype=float)])[0]
+
+# Function to calculate the Supertrend line and its direction over the bars with a full high/low/close
+def supertrend(high, low, close, period=10, multiplier=3.0):
+    def trend(high, low, close):
+        atr = average_true_range(high, low, close, period)
+        return kernel_function(supertrend_loop)(kernel_input(high), kernel_input(low), kernel_input(close),
+                                                kernel_input(atr), multiplier)
+
+    columns = [np.asarray(values, dtype=float) for values in (high, low, close)]
+    return skip_gaps(trend, columns)
+
+# Function to add the path-dependent indicators to a ticker's OHLC frame
+def calculate_path_indicators(data):
+    high = data['High'].to_numpy(dtype=float)
+    low = data['Low'].to_numpy(dtype=float)
+    close = data['Close'].to_numpy(dtype=float)
+    data['RSI_Wilder'] = wilder_rsi(close)
+    data['ATR_14'] = average_true_range(high, low, close)
+    data['PSAR'] = parabolic_sar(high, low)
+    data['Supertrend'], data['Supertrend_Direction'] = supertrend(high, low, close)
+    return data
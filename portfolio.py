@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+
+from indicators import prefix_sums, price_panel, rolling_std
+from marketcache import CACHE_DIR
+from marketdata import fetch_symbols, normalize_ticker
+from ttlcache import TTLCache
+
+# Trading sessions per year, used to annualize returns and volatility
+PERIODS_PER_YEAR = 252
+# Market index used for beta
+BENCHMARK = '^NSEI'
+# Random weight vectors drawn for the Monte Carlo frontier
+N_PORTFOLIOS = 20000
+
+# Returns, mean and covariance per (symbol set, date range); constraint tweaks reuse them
+statistics_cache = TTLCache(ttl=3600, maxsize=32)
+
+# Function to turn a (dates x tickers) close panel into simple daily returns
+def daily_returns(prices):
+    return prices.pct_change(fill_method=None).iloc[1:]
+
+# Function to compute annualized mean returns, covariance and correlation over the common history
+def risk_statistics(returns):
+    common = returns.dropna()
+    values = common.to_numpy(dtype=float)
+    if len(values) < 2:
+        raise ValueError("Not enough overlapping history to estimate the covariance")
+    centred = values - values.mean(axis=0)
+    covariance = centred.T @ centred / (len(values) - 1)
+    volatility = np.sqrt(np.diag(covariance))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlation = covariance / np.outer(volatility, volatility)
+    columns = returns.columns
+    return {
+        'mean': pd.Series(values.mean(axis=0) * PERIODS_PER_YEAR, index=columns),
+        'covariance': pd.DataFrame(covariance * PERIODS_PER_YEAR, index=columns, columns=columns),
+        'correlation': pd.DataFrame(correlation, index=columns, columns=columns),
+        'observations': len(values),
+    }
+
+# Function to fetch prices for a watchlist plus the benchmark and compute its risk statistics once
+def load_portfolio_statistics(symbols, start_date, end_date, benchmark=BENCHMARK, cache=statistics_cache,
+                              cache_dir=CACHE_DIR):
+    symbols = list(dict.fromkeys(symbols))
+    key = (tuple(sorted(symbols)), str(start_date), str(end_date), benchmark)
+    statistics = cache.get(key)
+    if statistics is not None:
+        return statistics
+
+    yf_symbols = {normalize_ticker(symbol): symbol for symbol in symbols}
+    downloaded = fetch_symbols(list(yf_symbols) + [benchmark], start_date, end_date, cache_dir=cache_dir)
+    market_data = {yf_symbols[symbol]: frame for symbol, frame in downloaded.items() if symbol in yf_symbols}
+    if len(market_data) < 2:
+        raise ValueError("At least two symbols with data are needed for portfolio analysis")
+    prices = price_panel(market_data)[[symbol for symbol in symbols if symbol in market_data]]
+    returns = daily_returns(prices)
+    market = None
+    if benchmark in downloaded:
+        market = daily_returns(downloaded[benchmark]['Close']).reindex(returns.index)
+
+    statistics = risk_statistics(returns)
+    statistics.update(returns=returns, market=market, missing=[s for s in symbols if s not in market_data])
+    cache.put(key, statistics)
+    return statistics
+
+# Function to compute annualized rolling volatility for every column of a returns panel
+def rolling_volatility(returns, window=20):
+    values = returns.to_numpy(dtype=float)
+    volatility = rolling_std(prefix_sums(values, with_squares=True), window) * np.sqrt(PERIODS_PER_YEAR)
+    return pd.DataFrame(volatility, index=returns.index, columns=returns.columns)
+
+# Function to compute rolling beta of every column against the market returns
+def rolling_beta(returns, market, window=60):
+    values = returns.to_numpy(dtype=float)
+    benchmark = market.to_numpy(dtype=float)[:, None]
+    # Covariance over a window is shift-invariant, so prefix sums of the raw products are safe here
+    valid = ~np.isnan(values) & ~np.isnan(benchmark)
+    x = np.where(valid, values, 0.0)
+    y = np.where(valid, benchmark, 0.0)
+    zeros = np.zeros((1, values.shape[1]))
+
+    def window_total(series):
+        running = np.concatenate([zeros, np.cumsum(series, axis=0)])
+        totals = np.full(values.shape, np.nan)
+        totals[window - 1:] = running[window:] - running[:-window]
+        return totals
+
+    count = window_total(valid.astype(float))
+    sum_x, sum_y = window_total(x), window_total(y)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covariance = window_total(x * y) - sum_x * sum_y / count
+        variance = window_total(y * y) - sum_y * sum_y / count
+        beta = np.where(count == window, covariance / variance, np.nan)
+    return pd.DataFrame(beta, index=returns.index, columns=returns.columns)
+
+# Function to cap every weight at max_weight, handing the excess to the uncapped assets of each row
+def cap_weights(weights, max_weight):
+    n_assets = weights.shape[1]
+    if max_weight * n_assets < 1 - 1e-12:
+        raise ValueError(f"A {max_weight:.0%} cap cannot be met with {n_assets} assets")
+    weights = weights.copy()
+    for _ in range(n_assets):
+        excess = np.clip(weights - max_weight, 0, None).sum(axis=1, keepdims=True)
+        if not (excess > 1e-12).any():
+            break
+        weights = np.minimum(weights, max_weight)
+        room = np.where(weights < max_weight, weights, 0.0)
+        share = room.sum(axis=1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weights += np.where(share > 0, room / share, 0.0) * excess
+    return weights
+
+# Function to draw long-only random portfolios and score them from the cached mean and covariance
+def random_portfolios(mean, covariance, n_portfolios=N_PORTFOLIOS, max_weight=None, risk_free=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    mean = np.asarray(mean, dtype=float)
+    covariance = np.asarray(covariance, dtype=float)
+    weights = rng.dirichlet(np.ones(len(mean)), size=n_portfolios)
+    if max_weight is not None and max_weight < 1:
+        weights = cap_weights(weights, max_weight)
+    expected = weights @ mean
+    volatility = np.sqrt(np.maximum(((weights @ covariance) * weights).sum(axis=1), 0.0))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sharpe = (expected - risk_free) / volatility
+    return {'weights': weights, 'return': expected, 'volatility': volatility, 'sharpe': sharpe}
+
+# Function to compute the closed-form (shorting allowed) Markowitz frontier for a range of target returns
+def efficient_frontier(mean, covariance, points=60):
+    mean = np.asarray(mean, dtype=float)
+    inverse = np.linalg.pinv(np.asarray(covariance, dtype=float))
+    ones = np.ones(len(mean))
+    a = ones @ inverse @ ones
+    b = ones @ inverse @ mean
+    c = mean @ inverse @ mean
+    d = a * c - b * b
+    # Upper branch only: from the minimum-variance portfolio up past the best single asset
+    minimum = b / a
+    span = max(mean.max() - minimum, abs(minimum), 1e-4) * 1.5
+    targets = np.linspace(minimum, minimum + span, points)
+    if d <= 0:
+        # Every asset has the same expected return: the frontier collapses to one point
+        targets = targets[:1]
+        variance = np.array([1 / a])
+    else:
+        variance = (a * targets ** 2 - 2 * b * targets + c) / d
+    return pd.DataFrame({'Return': targets, 'Volatility': np.sqrt(np.maximum(variance, 0.0))})
+
+# Function to pick the minimum-volatility and maximum-Sharpe portfolios out of a random cloud
+def best_portfolios(cloud, symbols):
+    picks = {'Minimum Volatility': int(np.nanargmin(cloud['volatility'])),
+             'Maximum Sharpe': int(np.nanargmax(cloud['sharpe']))}
+    rows = {}
+    for name, i in picks.items():
+        rows[name] = dict(zip(symbols, cloud['weights'][i]), Return=cloud['return'][i],
+                          Volatility=cloud['volatility'][i], Sharpe=cloud['sharpe'][i])
+    return pd.DataFrame(rows).T
@@ -0,0 +1,205 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from marketdata import BATCH_SIZE, normalize_ticker
+from marketprovider import get_provider
+
+# Upstream requests allowed per second across every session, and the burst the bucket can absorb
+REQUESTS_PER_SECOND = 2.0
+REQUEST_BURST = 4
+# Concurrent upstream requests
+MAX_WORKERS = 4
+# Seconds between polls of a symbol that is moving, and the ceiling a quiet symbol backs off to
+FAST_INTERVAL = 10.0
+SLOW_INTERVAL = 120.0
+# A change of at least this fraction between two polls marks a symbol as moving
+MOVING_THRESHOLD = 0.002
+# Symbols nobody has looked at for this many seconds stop being polled
+IDLE_TIMEOUT = 300.0
+
+# Thread-safe token bucket: acquire() blocks until a request may be sent
+class RateLimiter:
+    def __init__(self, rate=REQUESTS_PER_SECOND, burst=REQUEST_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+# Function to read the latest close and its change (%) from a downloaded frame; None when it has no valid
+# close, as for suspended or delisted symbols whose recent bars are all NaN
+def parse_quote(frame):
+    if frame is None or frame.empty:
+        return None
+    close = frame['Close'].dropna()
+    if close.empty:
+        return None
+    latest = float(close.iloc[-1])
+    before = float(close.iloc[-2]) if len(close) > 1 else 0.0
+    return latest, (latest / before - 1) * 100 if before else None
+
+# Background poller that keeps one shared snapshot of the latest quotes for every watched symbol.
+# Sessions watching the same symbol share its schedule, so each symbol has at most one request in flight.
+class QuoteScheduler:
+    def __init__(self, provider=None, limiter=None, max_workers=MAX_WORKERS, batch_size=BATCH_SIZE,
+                 fast_interval=FAST_INTERVAL, slow_interval=SLOW_INTERVAL, idle_timeout=IDLE_TIMEOUT):
+        self.provider = provider
+        self.limiter = limiter or RateLimiter()
+        self.batch_size = batch_size
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self.idle_timeout = idle_timeout
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.snapshot = {}
+        self.due = {}
+        self.interval = {}
+        self.last_seen = {}
+        self.in_flight = set()
+        self.requests = 0
+        self.thread = None
+
+    # Function to start the polling thread once
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='quote-scheduler', daemon=True)
+                self.thread.start()
+        return self
+
+    # Function to register interest in symbols; new ones are polled right away
+    def watch(self, symbols):
+        now = time.monotonic()
+        with self.lock:
+            for symbol in symbols:
+                symbol = normalize_ticker(symbol)
+                self.last_seen[symbol] = now
+                if symbol not in self.due:
+                    self.due[symbol] = now
+                    self.interval[symbol] = self.fast_interval
+        self.wake.set()
+
+    # Function to ask for a fresh quote now, unless one is already on its way
+    def refresh(self, symbols):
+        now = time.monotonic()
+        with self.lock:
+            for symbol in symbols:
+                symbol = normalize_ticker(symbol)
+                self.last_seen[symbol] = now
+                self.due[symbol] = now
+                self.interval.setdefault(symbol, self.fast_interval)
+        self.wake.set()
+
+    # Function to read the current rows for symbols (None values until the first quote arrives)
+    def quotes(self, symbols):
+        self.watch(symbols)
+        rows = []
+        with self.lock:
+            for symbol in symbols:
+                row = self.snapshot.get(normalize_ticker(symbol), {})
+                rows.append({
+                    'Instrument': symbol,
+                    'Latest Value': row.get('Latest Value'),
+                    'Change %': row.get('Change %'),
+                    'Updated': row.get('Updated'),
+                    'Poll Interval (s)': self.interval.get(normalize_ticker(symbol)),
+                })
+        return rows
+
+    # Function to block until every symbol has a quote (or the timeout passes)
+    def wait_for(self, symbols, timeout=10.0):
+        symbols = [normalize_ticker(symbol) for symbol in symbols]
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self.lock:
+                if all(symbol in self.snapshot for symbol in symbols):
+                    return True
+            time.sleep(0.1)
+        return False
+
+    # Function to pick due symbols that are not already being fetched, dropping idle ones
+    def take_due(self):
+        now = time.monotonic()
+        with self.lock:
+            for symbol in [s for s, seen in self.last_seen.items() if now - seen > self.idle_timeout]:
+                for state in (self.last_seen, self.due, self.interval):
+                    state.pop(symbol, None)
+            due = [s for s, at in self.due.items() if at <= now and s not in self.in_flight]
+            self.in_flight.update(due)
+            upcoming = [at for s, at in self.due.items() if s not in self.in_flight]
+        return due, (min(upcoming) - now if upcoming else None)
+
+    # Function to fetch one batch under the rate limit and update the snapshot and poll intervals
+    def poll(self, symbols):
+        try:
+            self.limiter.acquire()
+            with self.lock:
+                self.requests += 1
+            downloaded = (self.provider or get_provider()).download(symbols, period='5d')
+        except Exception:
+            downloaded = {}
+        now = time.monotonic()
+        with self.lock:
+            try:
+                for symbol in symbols:
+                    interval = self.interval.get(symbol, self.fast_interval)
+                    try:
+                        quote = parse_quote(downloaded.get(symbol))
+                    except Exception:
+                        # One malformed frame must not cost the rest of the batch its quotes
+                        quote = None
+                    if quote is not None:
+                        latest, change = quote
+                        previous = self.snapshot.get(symbol, {}).get('Latest Value')
+                        # Poll movers often; let quiet symbols back off towards the slow interval.
+                        # Compared without dividing, so a previous close of zero counts any change as a move
+                        moved = previous is not None and latest != previous and \
+                            abs(latest - previous) >= MOVING_THRESHOLD * abs(previous)
+                        interval = self.fast_interval if moved else min(interval * 2, self.slow_interval)
+                        self.snapshot[symbol] = {'Latest Value': latest, 'Change %': change,
+                                                 'Updated': time.strftime('%H:%M:%S')}
+                    else:
+                        # Keep an empty row so waiting sessions know the symbol was tried
+                        self.snapshot.setdefault(symbol, {})
+                        interval = min(interval * 2, self.slow_interval)
+                    if symbol in self.due:
+                        self.interval[symbol] = interval
+                        self.due[symbol] = now + interval
+            finally:
+                # Whatever happened above, the batch is no longer in flight and can be polled again
+                self.in_flight.difference_update(symbols)
+        self.wake.set()
+
+    # Function run by the polling thread: send due symbols in batches, sleep until the next is due
+    def run(self):
+        while True:
+            due, wait = self.take_due()
+            for i in range(0, len(due), self.batch_size):
+                self.pool.submit(self.poll, due[i:i + self.batch_size])
+            self.wake.wait(timeout=wait if wait is not None else 1.0)
+            self.wake.clear()
+
+default_scheduler = None
+scheduler_lock = threading.Lock()
+
+# Function to get the process-wide scheduler shared by every Streamlit session, starting it on first use
+def get_scheduler():
+    global default_scheduler
+    with scheduler_lock:
+        if default_scheduler is None:
+            default_scheduler = QuoteScheduler().start()
+    return default_scheduler
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from indicators import calculate_technical_indicators
+from marketcache import CACHE_DIR
+from marketdata import fetch_market_data
+from pathkernels import calculate_path_indicators
+from ttlcache import TTLCache
+
+# Bar frequencies offered by the charts, as pandas period codes (Daily keeps the downloaded bars)
+FREQUENCIES = {'Daily': None, 'Weekly': 'W-FRI', 'Monthly': 'M'}
+# Columns that add up over a period; other non-price columns keep the period's last value
+SUMMED_COLUMNS = ['Volume', 'Bid_Volume', 'Offer_Volume']
+
+# Daily downloads and resampled, indicator-ready frames per (ticker, range, frequency)
+resample_cache = TTLCache(ttl=3600, maxsize=64)
+
+# Function to aggregate daily bars into weekly/monthly OHLCV bars labelled by each period's last session
+def resample_ohlc(data, frequency):
+    rule = FREQUENCIES.get(frequency, frequency)
+    if rule is None or data.empty:
+        return data.copy()
+    data = data.sort_index()
+    codes = pd.DatetimeIndex(data.index).to_period(rule).asi8
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(codes)) + 1])
+    ends = np.concatenate([starts[1:], [len(codes)]]) - 1
+
+    bars = {}
+    for column in data.columns:
+        values = data[column].to_numpy()
+        if column == 'Open':
+            bars[column] = values[starts]
+        elif column == 'High':
+            bars[column] = np.fmax.reduceat(values.astype(float), starts)
+        elif column == 'Low':
+            bars[column] = np.fmin.reduceat(values.astype(float), starts)
+        elif column in SUMMED_COLUMNS:
+            totals = np.add.reduceat(np.nan_to_num(values.astype(float)), starts)
+            bars[column] = totals.astype(values.dtype) if np.issubdtype(values.dtype, np.integer) else totals
+        elif pd.api.types.is_numeric_dtype(values.dtype):
+            bars[column] = values[ends]
+    return pd.DataFrame(bars, index=data.index[ends])
+
+# Function to get a ticker's bars at a frequency with technical and path indicators computed on them;
+# the daily download is cached separately, so changing the frequency never downloads again
+def load_resampled(ticker, start_date, end_date, frequency='Daily', cache=resample_cache, cache_dir=CACHE_DIR):
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Unknown frequency: {frequency}")
+    key = (ticker, str(start_date), str(end_date))
+    frame = cache.get(key + (frequency,))
+    if frame is not None:
+        return frame
+
+    daily = cache.get(key)
+    if daily is None:
+        daily = fetch_market_data(ticker, start_date, end_date, cache_dir=cache_dir)
+        cache.put(key, daily)
+    frame = resample_ohlc(daily, frequency)
+    frame = calculate_path_indicators(calculate_technical_indicators(frame))
+    cache.put(key + (frequency,), frame)
+    return frame
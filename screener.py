@@ -0,0 +1,234 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from indicators import price_panel
+
+# Tokens of the rule language: numbers, column names / keywords, and operators
+TOKEN_PATTERN = re.compile(r"\s*(?:(\d+\.\d*|\.\d+|\d+)|([A-Za-z_][A-Za-z0-9_]*)|(<=|>=|==|!=|<|>|\(|\)|\+|-|\*|/))")
+KEYWORDS = {'and', 'or', 'not', 'crosses', 'above', 'below'}
+COMPARISONS = {
+    '<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal,
+    '==': np.equal, '!=': np.not_equal,
+}
+ARITHMETIC = {'+': np.add, '-': np.subtract, '*': np.multiply, '/': np.divide}
+
+# Function to split a rule into (kind, text) tokens
+def tokenize(rule):
+    tokens = []
+    position = 0
+    rule = rule.rstrip()
+    while position < len(rule):
+        match = TOKEN_PATTERN.match(rule, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Unexpected text in rule at: {rule[position:].strip()!r}")
+        number, word, symbol = match.groups()
+        if number is not None:
+            tokens.append(('number', number))
+        elif symbol is not None:
+            tokens.append(('symbol', symbol))
+        elif word.lower() in KEYWORDS:
+            tokens.append(('keyword', word.lower()))
+        else:
+            tokens.append(('name', word))
+        position = match.end()
+    return tokens
+
+# Shift a panel one row down so row t holds the value from t-1
+def previous_row(values):
+    if np.ndim(values) == 0:
+        return values
+    shifted = np.empty_like(values, dtype=float)
+    shifted[0] = np.nan
+    shifted[1:] = values[:-1]
+    return shifted
+
+# Recursive-descent parser that compiles a rule into a function of {column: 2-D array}.
+# Every node is (kind, evaluate) where kind is 'bool' or 'number'.
+class RuleParser:
+    def __init__(self, rule):
+        self.rule = rule
+        self.tokens = tokenize(rule)
+        self.position = 0
+        self.columns = []
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def accept(self, kind, text=None):
+        token = self.peek()
+        if token[0] == kind and (text is None or token[1] == text):
+            self.position += 1
+            return token
+        return None
+
+    def expect(self, kind, text):
+        if self.accept(kind, text) is None:
+            raise ValueError(f"Expected '{text}' in rule: {self.rule}")
+
+    def parse(self):
+        if not self.tokens:
+            raise ValueError("Rule is empty")
+        kind, evaluate = self.parse_or()
+        if self.position < len(self.tokens):
+            raise ValueError(f"Unexpected '{self.peek()[1]}' in rule: {self.rule}")
+        if kind != 'bool':
+            raise ValueError(f"Rule must be a condition, not a value: {self.rule}")
+        return evaluate
+
+    def boolean(self, node):
+        if node[0] != 'bool':
+            raise ValueError(f"'and'/'or'/'not' need conditions on both sides: {self.rule}")
+        return node[1]
+
+    def parse_or(self):
+        node = self.parse_and()
+        while self.accept('keyword', 'or'):
+            left, right = self.boolean(node), self.boolean(self.parse_and())
+            node = ('bool', lambda panels, left=left, right=right: left(panels) | right(panels))
+        return node
+
+    def parse_and(self):
+        node = self.parse_not()
+        while self.accept('keyword', 'and'):
+            left, right = self.boolean(node), self.boolean(self.parse_not())
+            node = ('bool', lambda panels, left=left, right=right: left(panels) & right(panels))
+        return node
+
+    def parse_not(self):
+        if self.accept('keyword', 'not'):
+            operand = self.boolean(self.parse_not())
+            return ('bool', lambda panels: ~operand(panels))
+        return self.parse_comparison()
+
+    def number(self, node):
+        if node[0] != 'number':
+            raise ValueError(f"Comparisons need values on both sides: {self.rule}")
+        return node[1]
+
+    def parse_comparison(self):
+        node = self.parse_sum()
+        token = self.peek()
+        if token[0] == 'symbol' and token[1] in COMPARISONS:
+            self.position += 1
+            compare = COMPARISONS[token[1]]
+            left, right = self.number(node), self.number(self.parse_sum())
+            return ('bool', lambda panels: compare(left(panels), right(panels)))
+        if self.accept('keyword', 'crosses'):
+            # "A crosses B" means A crosses above B
+            above = not self.accept('keyword', 'below')
+            if above:
+                self.accept('keyword', 'above')
+            left, right = self.number(node), self.number(self.parse_sum())
+
+            def crosses(panels):
+                a, b = left(panels), right(panels)
+                before_a, before_b = previous_row(a), previous_row(b)
+                if above:
+                    return (a > b) & (before_a <= before_b)
+                return (a < b) & (before_a >= before_b)
+            return ('bool', crosses)
+        return node
+
+    def parse_sum(self):
+        node = self.parse_product()
+        while self.peek()[0] == 'symbol' and self.peek()[1] in ('+', '-'):
+            operation = ARITHMETIC[self.tokens[self.position][1]]
+            self.position += 1
+            left, right = self.number(node), self.number(self.parse_product())
+            node = ('number', lambda panels, left=left, right=right, operation=operation:
+                    operation(left(panels), right(panels)))
+        return node
+
+    def parse_product(self):
+        node = self.parse_unary()
+        while self.peek()[0] == 'symbol' and self.peek()[1] in ('*', '/'):
+            operation = ARITHMETIC[self.tokens[self.position][1]]
+            self.position += 1
+            left, right = self.number(node), self.number(self.parse_unary())
+            node = ('number', lambda panels, left=left, right=right, operation=operation:
+                    operation(left(panels), right(panels)))
+        return node
+
+    def parse_unary(self):
+        if self.accept('symbol', '-'):
+            operand = self.number(self.parse_unary())
+            return ('number', lambda panels: -operand(panels))
+        return self.parse_primary()
+
+    def parse_primary(self):
+        token = self.accept('number')
+        if token:
+            value = float(token[1])
+            return ('number', lambda panels: value)
+        token = self.accept('name')
+        if token:
+            name = token[1]
+            if name not in self.columns:
+                self.columns.append(name)
+            return ('number', lambda panels: panels[name])
+        if self.accept('symbol', '('):
+            node = self.parse_or()
+            self.expect('symbol', ')')
+            return node
+        token = self.peek()
+        raise ValueError(f"Unexpected {'end of rule' if token[0] is None else repr(token[1])} in rule: {self.rule}")
+
+# Compiled screening rule: the columns it reads and a function from panels to a boolean mask
+class Rule:
+    def __init__(self, text):
+        parser = RuleParser(text)
+        self.text = text
+        self.evaluate = parser.parse()
+        self.columns = parser.columns
+
+    # Function to evaluate the rule over {column: (dates x tickers) array}
+    def mask(self, panels):
+        missing = [name for name in self.columns if name not in panels]
+        if missing:
+            raise ValueError(f"Unknown column(s) in rule: {', '.join(missing)}")
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.asarray(self.evaluate(panels), dtype=bool)
+
+# Function to build the (dates x tickers) panels a rule reads from {ticker: frame}
+def screen_panels(market_data, columns):
+    panels = {}
+    for column in columns:
+        if not all(column in data for data in market_data.values()):
+            raise ValueError(f"Unknown column in rule: {column}")
+        panels[column] = price_panel(market_data, column)
+    return panels
+
+# Function to run a rule over {column: DataFrame} panels and return the ranked hits table
+def screen_panel(panels, rule, lookback=None):
+    rule = rule if isinstance(rule, Rule) else Rule(rule)
+    frames = {name: panels[name] for name in rule.columns if name in panels}
+    if not frames:
+        raise ValueError(f"Unknown column(s) in rule: {', '.join(rule.columns) or rule.text}")
+    template = next(iter(frames.values()))
+    values = {name: frame.to_numpy(dtype=float) for name, frame in frames.items()}
+    mask = rule.mask(values)
+    if lookback is not None:
+        # Only report setups from the last `lookback` sessions
+        mask[:-lookback] = False
+    rows, cols = np.nonzero(mask)
+    hits = pd.DataFrame({'Ticker': template.columns[cols], 'Date': template.index[rows]})
+    for name in rule.columns:
+        hits[name] = values[name][rows, cols]
+    return rank_hits(hits)
+
+# Function to rank hits: most recent first, then tickers that triggered most often
+def rank_hits(hits):
+    if hits.empty:
+        return hits.assign(Hits=pd.Series(dtype=int))
+    hits['Hits'] = hits.groupby('Ticker')['Ticker'].transform('size')
+    hits = hits.sort_values(['Date', 'Hits', 'Ticker'], ascending=[False, False, True], kind='stable')
+    return hits.reset_index(drop=True)
+
+# Function to screen {ticker: frame} with a rule and return the ranked hits table
+def screen(market_data, rule, lookback=None):
+    rule = rule if isinstance(rule, Rule) else Rule(rule)
+    if not market_data:
+        return rank_hits(pd.DataFrame(columns=['Ticker', 'Date'] + rule.columns))
+    return screen_panel(screen_panels(market_data, rule.columns), rule, lookback)
@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objs as go
+
+from compact import weekday_means
+from downsample import MAX_POINTS, WEBGL_THRESHOLD, downsample_bars, downsample_xy
+
+# Function to build a line (or marker) trace, downsampled and switched to WebGL when large
+def line_trace(x, y, name, max_points=MAX_POINTS, mode='lines', **kwargs):
+    x, y = downsample_xy(x, y, max_points)
+    trace = go.Scattergl if len(y) > WEBGL_THRESHOLD else go.Scatter
+    return trace(x=x, y=y, mode=mode, name=name, **kwargs)
+
+# Function to build a bar trace, keeping the tallest bar per bucket when there are too many
+def bar_trace(x, y, name, max_points=MAX_POINTS, **kwargs):
+    x, y = downsample_bars(x, y, max_points)
+    return go.Bar(x=x, y=y, name=name, **kwargs)
+
+# Function to plot the trend (daily, or of resampled bars) with technical indicators
+def plot_daily_trend_with_indicators(data, ticker, max_points=MAX_POINTS, frequency='Daily'):
+    fig = go.Figure()
+    fig.add_trace(line_trace(data.index, data['Close'], 'Close', max_points))
+    fig.add_trace(line_trace(data.index, data['SMA_20'], 'SMA 20', max_points))
+    fig.add_trace(line_trace(data.index, data['SMA_50'], 'SMA 50', max_points))
+    fig.add_trace(line_trace(data.index, data['EMA_20'], 'EMA 20', max_points))
+    fig.add_trace(line_trace(data.index, data['BB_Upper'], 'BB Upper', max_points, line=dict(dash='dash')))
+    fig.add_trace(line_trace(data.index, data['BB_Lower'], 'BB Lower', max_points, line=dict(dash='dash')))
+    if 'Supertrend' in data:
+        fig.add_trace(line_trace(data.index, data['Supertrend'], 'Supertrend', max_points, line=dict(dash='dot')))
+        fig.add_trace(line_trace(data.index, data['PSAR'], 'Parabolic SAR', max_points, mode='markers', marker=dict(size=3)))
+    fig.update_layout(title=f'{frequency} Trend with Technical Indicators for {ticker}', xaxis_title='Date', yaxis_title='Price')
+    return fig
+
+# Function to plot OHLC candles, merging runs of bars when there are more than max_points of them
+def plot_candlestick(data, ticker, max_points=MAX_POINTS, frequency='Daily'):
+    data, per_candle = merge_candles(data, max_points)
+    fig = go.Figure(go.Candlestick(x=data.index, open=data['Open'], high=data['High'], low=data['Low'],
+                                   close=data['Close'], name=ticker))
+    title = f'{frequency} Candles for {ticker}'
+    if per_candle > 1:
+        title += f' ({per_candle} bars per candle)'
+    fig.update_layout(title=title, xaxis_title='Date', yaxis_title='Price', xaxis_rangeslider_visible=False)
+    return fig
+
+# Function to merge runs of consecutive bars into at most max_points candles (first open, highest high,
+# lowest low, last close, labelled by the run's last bar); returns the candles and the bars per candle
+def merge_candles(data, max_points=MAX_POINTS):
+    if max_points is None or len(data) <= max_points:
+        return data, 1
+    per_candle = -(-len(data) // max_points)
+    # Runs end on the last bar, so the newest candle is always a full one
+    starts = np.arange(len(data) % per_candle, len(data), per_candle)
+    if starts[0] != 0:
+        starts = np.concatenate([[0], starts])
+    ends = np.append(starts[1:], len(data)) - 1
+    merged = pd.DataFrame({
+        'Open': data['Open'].to_numpy(dtype=float)[starts],
+        'High': np.fmax.reduceat(data['High'].to_numpy(dtype=float), starts),
+        'Low': np.fmin.reduceat(data['Low'].to_numpy(dtype=float), starts),
+        'Close': data['Close'].to_numpy(dtype=float)[ends],
+    }, index=data.index[ends])
+    return merged, per_candle
+
+# Function to plot MACD
+def plot_macd(data, max_points=MAX_POINTS):
+    fig = go.Figure()
+    fig.add_trace(line_trace(data.index, data['MACD'], 'MACD', max_points))
+    fig.add_trace(line_trace(data.index, data['Signal_Line'], 'Signal Line', max_points))
+    fig.update_layout(title='MACD', xaxis_title='Date', yaxis_title='Value')
+    return fig
+
+# Function to plot RSI
+def plot_rsi(data, max_points=MAX_POINTS):
+    fig = go.Figure()
+    fig.add_trace(line_trace(data.index, data['RSI'], 'RSI', max_points))
+    if 'RSI_Wilder' in data:
+        fig.add_trace(line_trace(data.index, data['RSI_Wilder'], 'RSI (Wilder)', max_points))
+    fig.update_layout(title='Relative Strength Index (RSI)', xaxis_title='Date', yaxis_title='RSI')
+    return fig
+
+# Function to plot day-wise analysis
+def plot_daywise_analysis(data):
+    avg_price = weekday_means(data, ['Close'])
+    fig = px.bar(avg_price, x=avg_price.index, y='Close', title='Average Closing Price by Day of the Week')
+    return fig
+
+# Function to plot bid/offer volumes
+def plot_bid_offer_volumes(data, max_points=MAX_POINTS):
+    fig = go.Figure()
+    fig.add_trace(bar_trace(data.index, data['Bid_Volume'], 'Bid Volume', max_points, marker_color='blue'))
+    fig.add_trace(bar_trace(data.index, data['Offer_Volume'], 'Offer Volume', max_points, marker_color='red'))
+    fig.update_layout(title='Bid/Offer Volumes', xaxis_title='Date', yaxis_title='Volume', barmode='group')
+    return fig
+
+# Function to plot weekly bid/offer volume trends
+def plot_weekly_bid_offer_trends(data):
+    averages = weekday_means(data, ['Bid_Volume', 'Offer_Volume'])
+    avg_bid_volume = averages['Bid_Volume']
+    avg_offer_volume = averages['Offer_Volume']
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=avg_bid_volume.index, y=avg_bid_volume, name='Avg Bid Volume', marker_color='blue'))
+    fig.add_trace(go.Bar(x=avg_offer_volume.index, y=avg_offer_volume, name='Avg Offer Volume', marker_color='red'))
+    fig.update_layout(title='Weekly Bid/Offer Volume Trends', xaxis_title='Day of the Week', yaxis_title='Volume', barmode='group')
+    return fig
+
+# Function to plot every column of a (dates x tickers) frame as its own line
+def plot_lines(frame, title, yaxis_title, max_points=MAX_POINTS):
+    fig = go.Figure()
+    for column in frame.columns:
+        fig.add_trace(line_trace(frame.index, frame[column], column, max_points))
+    fig.update_layout(title=title, xaxis_title='Date', yaxis_title=yaxis_title)
+    return fig
+
+# Function to plot one backtest equity curve per ticker from a (dates x tickers) equity frame
+def plot_equity_curves(equity, max_points=MAX_POINTS):
+    return plot_lines(equity, 'Backtest Equity Curves', 'Growth of 1', max_points)
+
+# Function to plot a correlation matrix as a heatmap
+def plot_correlation_heatmap(correlation):
+    fig = px.imshow(correlation, zmin=-1, zmax=1, color_continuous_scale='RdBu_r', text_auto='.2f')
+    fig.update_layout(title='Return Correlation')
+    return fig
+
+# Function to plot the random-portfolio cloud coloured by Sharpe ratio with the closed-form frontier
+def plot_efficient_frontier(cloud, frontier, best=None):
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=cloud['volatility'], y=cloud['return'], mode='markers', name='Random Portfolios',
+                               marker=dict(size=3, color=cloud['sharpe'], colorscale='Viridis', showscale=True,
+                                           colorbar=dict(title='Sharpe'))))
+    fig.add_trace(go.Scatter(x=frontier['Volatility'], y=frontier['Return'], mode='lines',
+                             name='Efficient Frontier (shorting allowed)', line=dict(color='red')))
+    if best is not None:
+        fig.add_trace(go.Scatter(x=best['Volatility'], y=best['Return'], mode='markers+text', text=best.index,
+                                 textposition='top center', name='Selected', marker=dict(size=12, symbol='star')))
+    fig.update_layout(title='Efficient Frontier', xaxis_title='Annual Volatility', yaxis_title='Annual Return')
+    return fig
+
+# Function to plot the simulated depth imbalance (whole book and best level) over time
+def plot_depth_imbalance(data, max_points=MAX_POINTS):
+    fig = go.Figure()
+    fig.add_trace(line_trace(data.index, data['Depth_Imbalance'], 'Depth Imbalance', max_points))
+    fig.add_trace(line_trace(data.index, data['Top_Imbalance'], 'Top-of-Book Imbalance', max_points, line=dict(dash='dot')))
+    fig.update_layout(title='Order Book Imbalance (bid - ask) / (bid + ask)', xaxis_title='Date', yaxis_title='Imbalance',
+                      yaxis=dict(range=[-1, 1]))
+    return fig
+
+# Function to plot one bar of a simulated L2 book as a depth ladder
+def plot_order_book(book, column=0, bar=-1):
+    bid_prices, ask_prices = book['bid_prices'][bar, column], book['ask_prices'][bar, column]
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=book['bid_sizes'][bar, column], y=bid_prices, orientation='h',
+                         name='Bids', marker_color='green'))
+    fig.add_trace(go.Bar(x=book['ask_sizes'][bar, column], y=ask_prices, orientation='h',
+                         name='Asks', marker_color='red'))
+    fig.update_layout(title='Simulated Order Book (latest bar)', xaxis_title='Size', yaxis_title='Price')
+    return fig
@@ -1,21 +1,16 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+from quotes import get_scheduler
 
-# Function to fetch stock data
+# Seconds between redraws of the snapshot table; the scheduler decides when each symbol is fetched
+REFRESH_SECONDS = 5
+
+# Function to read the shared snapshot for the watchlist from the background quote scheduler
 def fetch_stock_data(symbols):
-    data = {}
-    for symbol in symbols:
-        ticker = f"{symbol}.NS"
-        stock = yf.Ticker(ticker)
-        stock_data = stock.history(period="1d")
-        if not stock_data.empty:
-            data[symbol] = stock_data['Close'].values[0]
-        else:
-            data[symbol] = None
-    return data
+    result_df = pd.DataFrame(get_scheduler().quotes(symbols))
+    return result_df.astype({'Latest Value': float, 'Change %': float})
 
 st.title("Indian Stock Prices Fetcher")
 
@@ -24,14 +19,26 @@ uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
 
 if uploaded_file is not None:
     df = pd.read_csv(uploaded_file)
-    stock_symbols = df.iloc[:, 0].tolist()  # Read the first column ignoring the header
-    
+    stock_symbols = df.iloc[:, 0].astype(str).tolist()  # Read the first column ignoring the header
+
     if st.button("Fetch Latest Stock Prices"):
-        stock_data = fetch_stock_data(stock_symbols)
-        result_df = pd.DataFrame(stock_data.items(), columns=['Instrument', 'Latest Value'])
-        
-        st.write("## Stock Prices")
-        st.dataframe(result_df)
+        get_scheduler().refresh(stock_symbols)
+        # Give the first poll a moment so the table does not open empty
+        get_scheduler().wait_for(stock_symbols, timeout=10)
+        st.session_state['watching'] = True
+
+    if st.session_state.get('watching'):
+        live = st.checkbox("Keep prices updated", value=True)
+
+        @st.fragment(run_every=REFRESH_SECONDS if live else None)
+        def show_snapshot():
+            st.write("## Stock Prices")
+            st.dataframe(fetch_stock_data(stock_symbols))
+
+        show_snapshot()
+
+        # The download and charts use the snapshot as of this run of the page
+        result_df = fetch_stock_data(stock_symbols)
 
         # Generate CSV
         csv = result_df.to_csv(index=False)
@@ -0,0 +1,63 @@
+import streamlit as st
+import time
+import datetime
+from marketcache import CACHE_DIR
+from marketlake import load_lake, query_rule, top_movers, warm_lake
+from stockcharts import plot_lines
+
+# Streamlit app layout
+st.title("Market Data Lake Queries")
+
+# Input: Cache location (the same Parquet store the stock apps fill)
+cache_dir = st.sidebar.text_input("Market data cache directory", CACHE_DIR)
+
+# Input: Date range
+start_date = st.date_input("Start Date", value=datetime.date.today() - datetime.timedelta(days=365))
+end_date = st.date_input("End Date")
+
+# Load the selected range in the background as soon as the page opens (once per range and server
+# process), so the first query does not pay the cold snapshot read
+@st.cache_resource
+def start_warmup(cache_dir, start_date, end_date):
+    return warm_lake(start_date, end_date, cache_dir)
+
+warmup = start_warmup(cache_dir, start_date, end_date)
+
+# Input: Query
+query = st.selectbox("Query", ["Top gainers per day", "Top losers per day", "Rule screen"])
+if query == "Rule screen":
+    rule = st.text_input("Rule", "SMA_50 crosses SMA_200")
+    st.caption("Columns: Open, High, Low, Close, Volume, SMA_<n>, Return_<n>; operators: < > <= >= and or not crosses [above|below]")
+else:
+    top_n = st.number_input("Tickers per day", min_value=1, max_value=200, value=20, step=1)
+sessions = st.number_input("Only the last N sessions (0 = whole range)", min_value=0, value=5, step=1)
+
+# Run the query
+if st.button("Run Query"):
+    try:
+        started = time.perf_counter()
+        # Wait for the warm-up of this range instead of loading it a second time alongside it
+        warmup.join()
+        lake = load_lake(start_date, end_date, cache_dir)
+        loaded = time.perf_counter()
+        if query == "Rule screen":
+            results = query_rule(lake, rule, lookback=int(sessions) or None)
+        else:
+            results = top_movers(lake, int(top_n), losers=query == "Top losers per day", days=int(sessions) or None)
+        finished = time.perf_counter()
+
+        st.caption(f"{len(lake.tickers)} tickers x {len(lake.dates)} sessions: "
+                   f"loaded in {loaded - started:.2f}s, queried in {finished - loaded:.2f}s")
+        if loaded - started > 1:
+            st.caption("The first load after the cache changes rebuilds the yearly snapshots and reads them cold; "
+                       "later queries on this range come from memory.")
+        st.subheader(f"{query} ({len(results)} rows)")
+        st.dataframe(results)
+
+        # Chart the closes of the first few tickers in the result
+        tickers = list(results['Ticker'].drop_duplicates()[:10])
+        if tickers:
+            st.plotly_chart(plot_lines(lake.frame('Close')[tickers], 'Close', 'Price'))
+
+    except Exception as e:
+        st.error(f"Error running query: {e}")
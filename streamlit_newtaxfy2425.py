@@ -1,6 +1,9 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
+from taxengine import SlabTable, slabs_from_widths
+from taxoptimizer import DEDUCTIONS, NEW_STANDARD_DEDUCTION, OLD_STANDARD_DEDUCTION, optimize_regime
+from taxsensitivity import crossovers, sensitivity_curves, sensitivity_figures
 
 # Tax slabs data
 data = {
@@ -47,26 +50,20 @@ deductions_retained = [
     "Depreciation u/s 32 of the Income-tax act except additional depreciation"
 ]
 
+# Slab widths and percent rates per regime, compiled once by the shared tax engine
+regime_tables = {
+    'Old Tax Regime': SlabTable(slabs_from_widths([(250000, 0), (50000, 5), (200000, 5), (100000, 20), (300000, 20),
+                                                   (100000, 20), (200000, 30), (300000, 30), (float('inf'), 30)])),
+    'New Tax Regime': SlabTable(slabs_from_widths([(300000, 0), (400000, 5), (300000, 10), (200000, 15), (300000, 20), (float('inf'), 30)])),
+}
+
 # Function to calculate tax
 def calculate_tax(income, standard_deduction, regime):
     taxable_income = income - standard_deduction
-    slabs = []
-    if regime == 'Old Tax Regime':
-        slabs = [(250000, 0), (50000, 5), (200000, 5), (100000, 20), (300000, 20), (100000, 20), (200000, 30), (300000, 30), (float('inf'), 30)]
-    else:
-        slabs = [(300000, 0), (400000, 5), (300000, 10), (200000, 15), (300000, 20), (float('inf'), 30)]
-    
-    tax = 0
-    details = []
-    for limit, rate in slabs:
-        if taxable_income <= 0:
-            break
-        applicable_amount = min(taxable_income, limit)
-        slab_tax = applicable_amount * rate / 100
-        tax += slab_tax
-        details.append((applicable_amount, rate, slab_tax))
-        taxable_income -= applicable_amount
-    
+    tax_table = regime_tables['Old Tax Regime' if regime == 'Old Tax Regime' else 'New Tax Regime']
+    tax = tax_table.tax(taxable_income)
+    details = [(amount, rate * 100, slab_tax) for _, rate, amount, slab_tax in tax_table.breakdown(taxable_income)
+               if amount > 0]
     return tax, details
 
 # Streamlit app
@@ -115,11 +112,11 @@ if st.button("Compare Tax Regimes"):
     
     st.subheader("Old Tax Regime Calculation Details")
     for i, (amount, rate, slab_tax) in enumerate(details_old):
-        st.write(f"Slab {i+1}: Income - Rs. {amount}, Rate - {rate}%, Tax - Rs. {slab_tax:.2f}")
+        st.write(f"Slab {i+1}: Income - Rs. {amount:.2f}, Rate - {rate:g}%, Tax - Rs. {slab_tax:.2f}")
     
     st.subheader("New Tax Regime Calculation Details")
     for i, (amount, rate, slab_tax) in enumerate(details_new):
-        st.write(f"Slab {i+1}: Income - Rs. {amount}, Rate - {rate}%, Tax - Rs. {slab_tax:.2f}")
+        st.write(f"Slab {i+1}: Income - Rs. {amount:.2f}, Rate - {rate:g}%, Tax - Rs. {slab_tax:.2f}")
 
     # Comparison summary
     st.subheader("Comparison Summary")
@@ -129,3 +126,44 @@ if st.button("Compare Tax Regimes"):
         st.write(f"You save Rs. {tax_new - tax_old:.2f} by opting for the Old Tax Regime.")
     else:
         st.write("Both regimes result in the same tax amount.")
+
+# Optimizer: redraws on every slider move, the whole deduction grid is one vectorized pass
+st.subheader("Regime Optimizer")
+st.write("Set how much you can claim under each deduction; both regimes are evaluated over every combination "
+         "from nothing up to those amounts (FY 2024-25 standard deduction: Rs. 50,000 old, Rs. 75,000 new).")
+headroom = {}
+for name, (label, cap, _) in DEDUCTIONS.items():
+    headroom[name] = st.slider(label, min_value=0, max_value=cap or 1000000, value=0, step=5000, key=f"headroom_{name}")
+
+result = optimize_regime(income, headroom)
+col1, col2, col3 = st.columns(3)
+col1.metric("Old Tax Regime", f"Rs. {result['old_tax']:,.0f}")
+col2.metric("New Tax Regime", f"Rs. {result['new_tax']:,.0f}")
+col3.metric("Best Choice", result['regime'], f"saves Rs. {result['saving']:,.0f}", delta_color="off")
+if result['minimum_claim'] is None:
+    st.write("No combination of these deductions makes the Old Tax Regime cheaper at this income.")
+else:
+    st.write(f"The Old Tax Regime costs no more than the New one from Rs. {result['minimum_claim']:,.0f} "
+             f"of claimed deductions.")
+
+st.write("Tax saved per extra rupee invested in each deduction (under the better regime):")
+st.dataframe(result['marginal'], hide_index=True)
+
+st.write("Old-regime deductions needed to break even, by income:")
+st.line_chart(result['break_even'], x='Income', y='Break-even Deductions')
+
+# Sensitivity: tax, effective and marginal rate of both regimes from Rs. 0 to Rs. 1 crore in Rs. 100 steps,
+# downsampled for the charts. Only the standard deductions apply, so the optimizer sliders never change the
+# cache key and every rerun reuses the same curves
+st.subheader("Tax Sensitivity")
+st.write("Both regimes after the standard deduction only (the optimizer above covers other deductions).")
+sensitivity_deductions = {'Old Tax Regime': OLD_STANDARD_DEDUCTION, 'New Tax Regime': NEW_STANDARD_DEDUCTION}
+curves = sensitivity_curves(regime_tables, sensitivity_deductions)
+for figure in sensitivity_figures(regime_tables, sensitivity_deductions).values():
+    st.plotly_chart(figure)
+switches = crossovers(curves)
+if switches.empty:
+    cheaper = min(regime_tables, key=lambda name: curves[name, 'Tax'].sum())
+    st.write(f"The {cheaper} costs no more at every income up to Rs. 1 crore.")
+for _, switch in switches.iterrows():
+    st.write(f"From Rs. {switch['Income']:,.0f} the {switch['Cheaper Above']} is cheaper than the {switch['Cheaper Below']}.")
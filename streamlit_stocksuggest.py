@@ -1,48 +1,9 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.graph_objects as go
-
-# Function to fetch stock data
-def fetch_stock_data(symbols):
-    data = []
-    for symbol in symbols:
-        ticker = f"{symbol}.NS"
-        stock = yf.Ticker(ticker)
-        stock_data = stock.history(period="1d")
-        if not stock_data.empty:
-            data.append({
-                'Instrument': symbol,
-                'Latest Value': stock_data['Close'].values[0],
-                'Open': stock_data['Open'].values[0],
-                'High': stock_data['High'].values[0],
-                'Low': stock_data['Low'].values[0],
-                'Volume': stock_data['Volume'].values[0],
-                'Market Cap': stock.info.get('marketCap', None),
-                '52-Week High': stock.info.get('fiftyTwoWeekHigh', None),
-                '52-Week Low': stock.info.get('fiftyTwoWeekLow', None),
-                'PE Ratio': stock.info.get('trailingPE', None),
-                'Dividend Yield': stock.info.get('dividendYield', None),
-                'Beta': stock.info.get('beta', None)
-            })
-        else:
-            data.append({
-                'Instrument': symbol,
-                'Latest Value': None,
-                'Open': None,
-                'High': None,
-                'Low': None,
-                'Volume': None,
-                'Market Cap': None,
-                '52-Week High': None,
-                '52-Week Low': None,
-                'PE Ratio': None,
-                'Dividend Yield': None,
-                'Beta': None
-            })
-    return data
+from fundamentals import fetch_price_history, fetch_stock_rows
 
 st.title("Indian Stock Prices Fetcher")
 
@@ -54,7 +15,10 @@ if uploaded_file is not None:
     stock_symbols = df.iloc[:, 0].tolist()  # Read the first column ignoring the header
     
     if st.button("Fetch Latest Stock Prices"):
-        stock_data = fetch_stock_data(stock_symbols)
+        # One batched 1-month history feeds the table, the trend chart and the volume chart;
+        # fundamentals are fetched concurrently and reused for a few minutes
+        history = fetch_price_history(stock_symbols, period="1mo")
+        stock_data = fetch_stock_rows(stock_symbols, history)
         result_df = pd.DataFrame(stock_data)
         
         st.write("## Stock Prices")
@@ -92,14 +56,13 @@ if uploaded_file is not None:
         
         # Line chart of stock prices
         st.write("## Line Chart of Stock Prices")
-        for symbol in stock_symbols:
-            ticker = f"{symbol}.NS"
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period="1mo")
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(x=hist.index, y=hist['Close'], mode='lines', name=symbol))
-            fig.update_layout(title=f'Price Trend for {symbol}', xaxis_title='Date', yaxis_title='Price')
-            st.plotly_chart(fig)
+        fig = go.Figure()
+        for symbol in dict.fromkeys(stock_symbols):
+            if symbol in history:
+                hist = history[symbol]
+                fig.add_trace(go.Scatter(x=hist.index, y=hist['Close'], mode='lines', name=str(symbol)))
+        fig.update_layout(title='Price Trend (1 Month)', xaxis_title='Date', yaxis_title='Price')
+        st.plotly_chart(fig)
 
         # Volume bar chart
         st.write("## Volume Bar Chart")
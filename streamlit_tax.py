@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
+from taxengine import SlabTable, slabs_from_widths
+from taxsensitivity import crossovers, sensitivity_curves, sensitivity_figures
 
 # Tax slabs data
 data = {
@@ -49,26 +51,21 @@ deductions_retained = [
     "Depreciation u/s 32 of the Income-tax act except additional depreciation"
 ]
 
+# Slab widths and percent rates per regime, compiled once by the shared tax engine
+regime_tables = {
+    'Old Tax Regime': SlabTable(slabs_from_widths([(250000, 0), (50000, 5), (200000, 5), (100000, 20), (300000, 20),
+                                                   (100000, 20), (200000, 30), (300000, 30), (float('inf'), 30)])),
+    'New Tax Regime': SlabTable(slabs_from_widths([(250000, 0), (50000, 0), (200000, 5), (100000, 5), (300000, 10),
+                                                   (100000, 15), (200000, 15), (300000, 20), (float('inf'), 30)])),
+}
+
 # Function to calculate tax
 def calculate_tax(income, standard_deduction, regime):
     taxable_income = income - standard_deduction
-    slabs = []
-    if regime == 'Old Tax Regime':
-        slabs = [(250000, 0), (50000, 5), (200000, 5), (100000, 20), (300000, 20), (100000, 20), (200000, 30), (300000, 30), (float('inf'), 30)]
-    else:
-        slabs = [(250000, 0), (50000, 0), (200000, 5), (100000, 5), (300000, 10), (100000, 15), (200000, 15), (300000, 20), (float('inf'), 30)]
-    
-    tax = 0
-    details = []
-    for limit, rate in slabs:
-        if taxable_income <= 0:
-            break
-        applicable_amount = min(taxable_income, limit)
-        slab_tax = applicable_amount * rate / 100
-        tax += slab_tax
-        details.append((applicable_amount, rate, slab_tax))
-        taxable_income -= applicable_amount
-    
+    tax_table = regime_tables['Old Tax Regime' if regime == 'Old Tax Regime' else 'New Tax Regime']
+    tax = tax_table.tax(taxable_income)
+    details = [(amount, rate * 100, slab_tax) for _, rate, amount, slab_tax in tax_table.breakdown(taxable_income)
+               if amount > 0]
     return tax, details
 
 # Streamlit app
@@ -115,4 +112,19 @@ if st.button("Calculate Tax"):
 
     st.subheader("Tax Calculation Details")
     for i, (amount, rate, slab_tax) in enumerate(details):
-        st.write(f"Slab {i+1}: Income - Rs. {amount}, Rate - {rate}%, Tax - Rs. {slab_tax:.2f}")
+        st.write(f"Slab {i+1}: Income - Rs. {amount:.2f}, Rate - {rate:g}%, Tax - Rs. {slab_tax:.2f}")
+
+# Sensitivity: tax, effective and marginal rate of both regimes from Rs. 0 to Rs. 1 crore in Rs. 100 steps,
+# computed once per set of deductions and downsampled for the charts
+st.subheader("Tax Sensitivity")
+st.write("Both regimes after the standard deduction entered above.")
+sensitivity_deductions = {name: standard_deduction for name in regime_tables}
+curves = sensitivity_curves(regime_tables, sensitivity_deductions)
+for figure in sensitivity_figures(regime_tables, sensitivity_deductions).values():
+    st.plotly_chart(figure)
+switches = crossovers(curves)
+if switches.empty:
+    cheaper = min(regime_tables, key=lambda name: curves[name, 'Tax'].sum())
+    st.write(f"The {cheaper} costs no more at every income up to Rs. 1 crore.")
+for _, switch in switches.iterrows():
+    st.write(f"From Rs. {switch['Income']:,.0f} the {switch['Cheaper Above']} is cheaper than the {switch['Cheaper Below']}.")
@@ -1,48 +1,24 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 import pandas as pd
 import plotly.express as px
 import plotly.io as pio
+from payroll import bulk_payroll, payroll_format, spool_upload
+from taxengine import regime_table
+from taxfigures import FigureTemplate
+from taxsensitivity import sensitivity_request
 
 app = Flask(__name__)
 
-# Tax slab rates for FY 2024-25
-tax_slabs = [
-    (300000, 0.00),
-    (600000, 0.05),
-    (900000, 0.10),
-    (1200000, 0.15),
-    (1500000, 0.20),
-    (float('inf'), 0.30)
-]
+# Tax slab rates for FY 2024-25, compiled once by the shared tax engine
+tax_table = regime_table('new_after_2023')
+bulk_tables = {'new_after_2023': tax_table}
+ranges_labels = ["Up to ₹3 lakhs", "₹3 lakhs to ₹6 lakhs", "₹6 lakhs to ₹9 lakhs",
+                 "₹9 lakhs to ₹12 lakhs", "₹12 lakhs to ₹15 lakhs", "Above ₹15 lakhs"]
 
 def calculate_tax(income):
-    tax = 0
-    previous_slab_limit = 0
-    effective_tax = []
-    income_ranges = [300000, 600000, 900000, 1200000, 1500000, float('inf')]
-    ranges_labels = ["Up to ₹3 lakhs", "₹3 lakhs to ₹6 lakhs", "₹6 lakhs to ₹9 lakhs", 
-                     "₹9 lakhs to ₹12 lakhs", "₹12 lakhs to ₹15 lakhs", "Above ₹15 lakhs"]
-
-    for i in range(len(tax_slabs)):
-        slab_limit, rate = tax_slabs[i]
-        if income > slab_limit:
-            taxable_income = slab_limit - previous_slab_limit
-            tax += taxable_income * rate
-            effective_tax.append((ranges_labels[i], rate * 100, taxable_income * rate))
-            previous_slab_limit = slab_limit
-        else:
-            taxable_income = income - previous_slab_limit
-            tax += taxable_income * rate
-            effective_tax.append((ranges_labels[i], rate * 100, taxable_income * rate))
-            return tax, effective_tax
-
-    # Handle income above the last slab
-    if income > tax_slabs[-1][0]:
-        taxable_income = income - tax_slabs[-1][0]
-        tax += taxable_income * tax_slabs[-1][1]
-        effective_tax.append((ranges_labels[-1], tax_slabs[-1][1] * 100, taxable_income * tax_slabs[-1][1]))
-
-    return tax, effective_tax
+    effective_tax = [(ranges_labels[i], rate * 100, slab_tax)
+                     for i, (_, rate, _, slab_tax) in enumerate(tax_table.breakdown(income))]
+    return tax_table.tax(income), effective_tax
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
@@ -71,6 +47,18 @@ def index():
             return jsonify(error="Invalid input amount"), 400
     return render_template('taxcal.html')
 
+# Figure skeletons for /visualize, built and serialized once; requests only patch in their numbers
+slab_figure = FigureTemplate(px.bar(pd.DataFrame({"Income Range": ranges_labels, "Effective Tax": [0.0] * len(ranges_labels)}),
+                                    x="Income Range", y="Effective Tax", title="Effective Tax per Income Range",
+                                    labels={"Effective Tax": "Tax Amount in ₹"}), fields=('y',))
+rate_figure = FigureTemplate(px.bar(pd.DataFrame({"Effective Tax Rate (%)": [0.0]}), y="Effective Tax Rate (%)",
+                                    title="Effective Tax Rate", labels={"Effective Tax Rate (%)": "Effective Tax Rate (%)"}),
+                             fields=('y',))
+deduction_types = ["Income", "Standard Deduction", "NPS Contribution", "Taxable Income"]
+deductions_figure = FigureTemplate(px.bar(pd.DataFrame({"Type": deduction_types, "Amount (₹)": [0.0] * 4}), x="Type",
+                                          y="Amount (₹)", title="Impact of Deductions", labels={"Amount (₹)": "Amount in ₹"}),
+                                   fields=('y',))
+
 @app.route('/visualize', methods=['POST'])
 def visualize():
     try:
@@ -79,60 +67,48 @@ def visualize():
         std_deduction = float(data.get('std_deduction', 50000))
         nps_contribution = float(data.get('nps_contribution', 50000))
         adjusted_income = income - std_deduction - nps_contribution
-        tax, effective_tax = calculate_tax(adjusted_income)
-        
-        # Data for visualization
-        income_ranges = [300000, 600000, 900000, 1200000, 1500000, float('inf')]
-        ranges_labels = ["Up to ₹3 lakhs", "₹3 lakhs to ₹6 lakhs", "₹6 lakhs to ₹9 lakhs", 
-                         "₹9 lakhs to ₹12 lakhs", "₹12 lakhs to ₹15 lakhs", "Above ₹15 lakhs"]
-        rates = [0, 0.05, 0.10, 0.15, 0.20, 0.30]
-        
-        remaining_income = adjusted_income
-        effective_tax = []
-        for i, slab in enumerate(income_ranges):
-            if remaining_income > 0:
-                if remaining_income >= slab:
-                    effective_tax.append(slab * rates[i])
-                    remaining_income -= slab
-                else:
-                    effective_tax.append(remaining_income * rates[i])
-                    remaining_income = 0
-            else:
-                effective_tax.append(0)
-
-        data = {
-            "Income Range": ranges_labels,
-            "Tax Rate": [rate * 100 for rate in rates],
-            "Effective Tax": effective_tax
-        }
-        
-        df = pd.DataFrame(data)
-        fig = px.bar(df, x="Income Range", y="Effective Tax", title="Effective Tax per Income Range", labels={"Effective Tax": "Tax Amount in ₹"})
-        graphJSON = pio.to_json(fig)
-        
+
+        # Tax charged in every slab, including the ones the income does not reach
+        effective_tax = tax_table.slab_taxes(adjusted_income).tolist()
+        graphJSON = slab_figure.render(y=effective_tax)
+
         # Effective Tax Rate Visualization
         total_effective_tax = sum(effective_tax)
         effective_tax_rate = (total_effective_tax / adjusted_income) * 100 if adjusted_income > 0 else 0
-        effective_tax_rate_data = {
-            "Effective Tax Rate (%)": [effective_tax_rate]
-        }
-        df_rate = pd.DataFrame(effective_tax_rate_data)
-        fig_rate = px.bar(df_rate, y="Effective Tax Rate (%)", title="Effective Tax Rate", labels={"Effective Tax Rate (%)": "Effective Tax Rate (%)"})
-        graphJSON_rate = pio.to_json(fig_rate)
-        
+        graphJSON_rate = rate_figure.render(y=[effective_tax_rate])
+
         # Deductions Impact Visualization
-        deduction_data = {
-            "Type": ["Income", "Standard Deduction", "NPS Contribution", "Taxable Income"],
-            "Amount (₹)": [income, -std_deduction, -nps_contribution, adjusted_income]
-        }
-        df_deductions = pd.DataFrame(deduction_data)
-        fig_deductions = px.bar(df_deductions, x="Type", y="Amount (₹)", title="Impact of Deductions", labels={"Amount (₹)": "Amount in ₹"})
-        graphJSON_deductions = pio.to_json(fig_deductions)
-        
+        graphJSON_deductions = deductions_figure.render(y=[income, -std_deduction, -nps_contribution, adjusted_income])
+
         return jsonify(graphJSON=graphJSON, graphJSON_rate=graphJSON_rate, graphJSON_deductions=graphJSON_deductions)
     except (ValueError, KeyError) as e:
         return jsonify(error="Invalid input amount"), 400
 
+@app.route('/bulk', methods=['POST'])
+def bulk():
+    # A multipart "file" upload or the raw request body; ?format= and ?output= override csv/ndjson
+    try:
+        upload = request.files.get('file')
+        if upload is not None:
+            fmt = payroll_format(request.args.get('format'), upload.filename, upload.mimetype)
+            # Werkzeug closes the upload when this view returns, so the stream reads its own copy
+            stream = spool_upload(upload.stream)
+        else:
+            stream = request.stream
+            fmt = payroll_format(request.args.get('format'), content_type=request.content_type)
+        output, mimetype = bulk_payroll(stream, fmt, request.args.get('output'), bulk_tables, 'new_after_2023',
+                                        owned=upload is not None)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return Response(stream_with_context(output), mimetype=mimetype)
+
+@app.route('/sensitivity', methods=['GET'])
+def sensitivity():
+    try:
+        return jsonify(sensitivity_request(request.args, bulk_tables))
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
 
 @app.route('/history', methods=['POST'])
 def history():
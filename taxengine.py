@@ -0,0 +1,113 @@
+import numpy as np
+
+# Slabs are (upper limit of taxable income, rate) in increasing order; the last limit is infinite
+OLD_REGIME = [
+    (250000, 0.00),
+    (500000, 0.05),
+    (1000000, 0.20),
+    (float('inf'), 0.30)
+]
+
+# New Regime (Before Budget 2023)
+NEW_REGIME_BEFORE_2023 = [
+    (250000, 0.00),
+    (500000, 0.05),
+    (750000, 0.10),
+    (1000000, 0.15),
+    (1250000, 0.20),
+    (1500000, 0.25),
+    (float('inf'), 0.30)
+]
+
+# New Regime (After Budget 2023)
+NEW_REGIME_AFTER_2023 = [
+    (300000, 0.00),
+    (600000, 0.05),
+    (900000, 0.10),
+    (1200000, 0.15),
+    (1500000, 0.20),
+    (float('inf'), 0.30)
+]
+
+# New Regime (FY 2024-25)
+NEW_REGIME_2024_25 = [
+    (300000, 0.00),
+    (700000, 0.05),
+    (1000000, 0.10),
+    (1200000, 0.15),
+    (1500000, 0.20),
+    (float('inf'), 0.30)
+]
+
+# Function to turn (slab width, rate in percent) pairs into (upper limit, rate) slabs
+def slabs_from_widths(widths):
+    slabs = []
+    limit = 0
+    for width, percent in widths:
+        limit += width
+        slabs.append((limit, percent / 100))
+    return slabs
+
+# A regime compiled into cumulative tables: income in slab i is taxed intercept[i] + income * rates[i]
+class SlabTable:
+    def __init__(self, slabs):
+        limits = np.array([limit for limit, _ in slabs], dtype=float)
+        if len(limits) == 0 or np.any(np.diff(limits) <= 0) or limits[-1] != np.inf:
+            raise ValueError("Slab limits must increase and end with an unlimited slab")
+        self.slabs = list(slabs)
+        self.upper = limits
+        self.lower = np.concatenate([[0.0], limits[:-1]])
+        self.rates = np.array([rate for _, rate in slabs], dtype=float)
+        widths = self.upper[:-1] - self.lower[:-1]
+        # Tax already owed when income reaches the bottom of each slab
+        self.base = np.concatenate([[0.0], np.cumsum(widths * self.rates[:-1])])
+        self.intercept = self.base - self.lower * self.rates
+
+    # Function to find the slab each income falls in (incomes at or below zero fall in the first)
+    def slab_index(self, income):
+        index = np.searchsorted(self.upper, income, side='left')
+        return np.minimum(index, len(self.upper) - 1)
+
+    # Function to compute the tax on a scalar or an array of taxable incomes
+    def tax(self, income):
+        income = np.maximum(np.asarray(income, dtype=float), 0.0)
+        index = self.slab_index(income)
+        tax = self.intercept[index] + income * self.rates[index]
+        return float(tax) if tax.ndim == 0 else tax
+
+    # Function to get the rate applied to the next rupee of each income
+    def marginal_rate(self, income):
+        index = np.searchsorted(self.upper, np.maximum(np.asarray(income, dtype=float), 0.0), side='right')
+        rate = self.rates[np.minimum(index, len(self.upper) - 1)]
+        return float(rate) if rate.ndim == 0 else rate
+
+    # Function to get the tax charged in every slab for one income (zero in slabs it does not reach)
+    def slab_taxes(self, income):
+        income = max(float(income), 0.0)
+        return np.clip(income - self.lower, 0.0, self.upper - self.lower) * self.rates
+
+    # Function to split one income over the slabs it reaches: (slab limit, rate, amount, tax) per slab
+    def breakdown(self, income):
+        income = max(float(income), 0.0)
+        amounts = np.clip(income - self.lower, 0.0, self.upper - self.lower)
+        reached = int(self.slab_index(income)) + 1
+        return [(limit, rate, float(amounts[i]), float(amounts[i]) * rate)
+                for i, (limit, rate) in enumerate(self.slabs[:reached])]
+
+# Every regime compiled once
+REGIME_TABLES = {
+    'old': SlabTable(OLD_REGIME),
+    'new_before_2023': SlabTable(NEW_REGIME_BEFORE_2023),
+    'new_after_2023': SlabTable(NEW_REGIME_AFTER_2023),
+    'new_2024_25': SlabTable(NEW_REGIME_2024_25),
+}
+
+# Function to look up a compiled regime by name
+def regime_table(regime):
+    if regime not in REGIME_TABLES:
+        raise ValueError(f"Invalid tax regime: {regime}")
+    return REGIME_TABLES[regime]
+
+# Function to compute tax on taxable income (scalar or array) under a named regime
+def calculate_tax(income, regime):
+    return regime_table(regime).tax(income)
@@ -0,0 +1,33 @@
+import json
+import math
+
+import plotly.io as pio
+
+# A Plotly figure serialized once at startup with its per-request trace fields left out:
+# render() splices plain JSON lists for those fields between the pre-built prefix and suffix
+class FigureTemplate:
+    def __init__(self, fig, fields=('x', 'y')):
+        spec = json.loads(pio.to_json(fig))
+        if len(spec['data']) != 1:
+            raise ValueError("Figure templates support exactly one trace")
+        trace = spec['data'][0]
+        for field in fields:
+            trace.pop(field, None)
+        self.fields = fields
+        # Trace properties minus the closing brace, so the patched fields can follow
+        self.prefix = '{"data":[' + json.dumps(trace, ensure_ascii=False)[:-1]
+        self.suffix = '}],"layout":' + json.dumps(spec['layout'], ensure_ascii=False) + '}'
+
+    # Function to produce the figure JSON for one request from its field values (sequences of numbers or labels)
+    def render(self, **values):
+        patched = ''.join(f', "{field}": {json.dumps([plain(v) for v in values[field]], ensure_ascii=False, allow_nan=False)}'
+                          for field in self.fields)
+        return self.prefix + patched + self.suffix
+
+# Function to turn NumPy scalars into plain Python values for json.dumps; NaN and infinities become
+# null as in pio.to_json, since json.dumps would write NaN/Infinity, which is not valid JSON
+def plain(value):
+    value = value.item() if hasattr(value, 'item') else value
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+from taxengine import REGIME_TABLES
+
+# FY 2024-25 standard deduction for salaried taxpayers under each regime
+OLD_STANDARD_DEDUCTION = 50000
+NEW_STANDARD_DEDUCTION = 75000
+# Deductions the optimizer can spread money over: label, statutory cap (None: only the
+# taxpayer's own headroom limits it) and whether the new regime allows it too
+DEDUCTIONS = {
+    '80C': ('Section 80C (PF, PPF, ELSS, life insurance)', 150000, False),
+    '80CCD(1B)': ('NPS under 80CCD(1B)', 50000, False),
+    '80D': ('Health insurance under 80D', 100000, False),
+    'HRA': ('HRA exemption', None, False),
+    '24(b)': ('Home loan interest under 24(b)', 200000, False),
+    '80CCD(2)': ('Employer NPS under 80CCD(2)', None, True),
+}
+# Upper bound on grid combinations evaluated per call; levels per deduction shrink as more are used
+GRID_POINTS = 200000
+# Step (in rupees) used for the marginal benefit of investing more in one deduction
+MARGINAL_STEP = 1000
+# Income and deduction axes of the break-even curve
+BREAK_EVEN_INCOMES = np.arange(0, 5000001, 10000)
+BREAK_EVEN_DEDUCTIONS = np.arange(0, 1000001, 1000)
+
+# Function to compute old- and new-regime tax for incomes (any shape) and claimed deductions
+# (same shape plus a trailing axis with one column per deduction name)
+def regime_taxes(income, claimed, names):
+    income = np.asarray(income, dtype=float)
+    claimed = np.asarray(claimed, dtype=float)
+    new_allowed = np.array([DEDUCTIONS[name][2] for name in names], dtype=bool)
+    old_taxable = income - OLD_STANDARD_DEDUCTION - claimed.sum(axis=-1)
+    new_taxable = income - NEW_STANDARD_DEDUCTION - claimed[..., new_allowed].sum(axis=-1)
+    return REGIME_TABLES['old'].tax(old_taxable), REGIME_TABLES['new_2024_25'].tax(new_taxable)
+
+# Function to clip the taxpayer's headroom to each deduction's statutory cap, dropping empty ones
+def usable_headroom(headroom):
+    usable = {}
+    for name, amount in headroom.items():
+        if name not in DEDUCTIONS:
+            raise ValueError(f"Unknown deduction: {name}")
+        cap = DEDUCTIONS[name][1]
+        amount = float(amount) if cap is None else min(float(amount), cap)
+        if amount > 0:
+            usable[name] = amount
+    return usable
+
+# Function to build every combination of claimed amounts, from nothing up to each headroom
+def deduction_grid(headroom, max_points=GRID_POINTS):
+    names = list(headroom)
+    if not names:
+        return names, np.zeros((1, 0))
+    steps = max(2, int(max_points ** (1 / len(names))))
+    levels = [np.linspace(0.0, headroom[name], steps) for name in names]
+    mesh = np.meshgrid(*levels, indexing='ij')
+    return names, np.stack([axis.ravel() for axis in mesh], axis=1)
+
+# Function to find, for each income, the old-regime deductions needed before the old regime costs no more
+# than the new one (NaN when even the largest amount on the axis is not enough). Deductions both regimes
+# allow (shared) come off the income on either side
+def break_even_curve(shared=0.0, incomes=BREAK_EVEN_INCOMES, deductions=BREAK_EVEN_DEDUCTIONS):
+    old_tax = REGIME_TABLES['old'].tax(incomes[:, None] - OLD_STANDARD_DEDUCTION - shared - deductions[None, :])
+    new_tax = REGIME_TABLES['new_2024_25'].tax(incomes - NEW_STANDARD_DEDUCTION - shared)
+    # Old-regime tax only falls as deductions grow, so the first affordable column is the break-even
+    even = old_tax <= new_tax[:, None]
+    needed = np.where(even.any(axis=1), deductions[np.argmax(even, axis=1)], np.nan)
+    return pd.DataFrame({'Income': incomes, 'Break-even Deductions': needed})
+
+# Function to compare both regimes over the whole deduction grid for one income and pick the best choice
+def optimize_regime(income, headroom, max_points=GRID_POINTS):
+    usable = usable_headroom(headroom)
+    names, grid = deduction_grid(usable, max_points)
+    old_tax, new_tax = regime_taxes(income, grid, names)
+    totals = grid.sum(axis=1)
+
+    # Full headroom is the last grid row; it is where the old regime is cheapest
+    full = len(grid) - 1
+    regime = 'Old Tax Regime' if old_tax[full] < new_tax[full] else 'New Tax Regime'
+    # Smallest total claim that makes the old regime at least as cheap as the new one
+    worthwhile = old_tax <= new_tax
+    minimum_claim = float(totals[worthwhile].min()) if worthwhile.any() else None
+
+    # Marginal benefit: tax saved under the better regime per extra rupee in each deduction
+    point = np.array([usable[name] for name in names])
+    bumped = np.tile(point, (len(names) + 1, 1))
+    for i, name in enumerate(names):
+        cap = DEDUCTIONS[name][1]
+        bumped[i + 1, i] = point[i] + MARGINAL_STEP if cap is None else min(point[i] + MARGINAL_STEP, cap)
+    bumped_old, bumped_new = regime_taxes(income, bumped, names)
+    best_tax = np.minimum(bumped_old, bumped_new)
+    step = bumped[1:].diagonal() - point if names else np.zeros(0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        marginal = np.where(step > 0, (best_tax[0] - best_tax[1:]) / step, 0.0)
+
+    return {
+        'regime': regime,
+        'old_tax': float(old_tax[full]),
+        'new_tax': float(new_tax[full]),
+        'saving': float(abs(old_tax[full] - new_tax[full])),
+        'claimed': dict(zip(names, point.tolist())),
+        'minimum_claim': minimum_claim,
+        'grid': pd.DataFrame(dict(zip(names, grid.T), **{'Total Deductions': totals, 'Old Tax': old_tax,
+                                                          'New Tax': new_tax})),
+        'break_even': break_even_curve(sum(amount for name, amount in usable.items() if DEDUCTIONS[name][2])),
+        'marginal': pd.DataFrame({'Deduction': [DEDUCTIONS[name][0] for name in names],
+                                  'Benefit per ₹': marginal}),
+    }
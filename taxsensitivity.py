@@ -0,0 +1,126 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+import plotly.io as pio
+
+from downsample import MAX_POINTS, WEBGL_THRESHOLD, downsample_xy
+from taxengine import regime_table
+from ttlcache import TTLCache
+
+# Default income grid: ₹0 to ₹1 crore in ₹100 steps (100,001 incomes per regime)
+SENSITIVITY_MAX_INCOME = 10000000
+SENSITIVITY_STEP = 100
+# Largest grid a request may ask for
+SENSITIVITY_MAX_GRID = 1000000
+# Curves plotted per regime, with their axis titles
+SENSITIVITY_METRICS = {'Tax': 'Total Tax (₹)', 'Effective Rate (%)': 'Effective Tax Rate (%)',
+                       'Marginal Rate (%)': 'Marginal Tax Rate (%)'}
+
+# Full-resolution curves, figures and their JSON per (regime set, deductions, grid[, display points]).
+# Each regime set costs three multi-MB entries, so only a few recent ones are kept, and briefly
+SENSITIVITY_CACHE_TTL = 600
+SENSITIVITY_CACHE_SIZE = 12
+sensitivity_cache = TTLCache(ttl=SENSITIVITY_CACHE_TTL, maxsize=SENSITIVITY_CACHE_SIZE)
+
+# Function to build a hashable key for a regime set: names with their slabs and the income deducted before tax
+def regime_set_key(tables, deductions):
+    if not all(np.isfinite(float(amount)) for amount in deductions.values()):
+        raise ValueError("Deductions must be finite amounts")
+    return tuple((name, tuple(table.slabs), float(deductions.get(name, 0))) for name, table in tables.items())
+
+# Function to check an income grid and return its incomes
+def income_grid(max_income=SENSITIVITY_MAX_INCOME, step=SENSITIVITY_STEP):
+    if not (step > 0 and max_income > 0):
+        raise ValueError("The income range and step must be positive")
+    if max_income / step >= SENSITIVITY_MAX_GRID:
+        raise ValueError(f"The income grid is limited to {SENSITIVITY_MAX_GRID} points")
+    return np.arange(0, max_income + step / 2, step, dtype=float)
+
+# Function to compute total tax, effective rate and marginal rate of every regime over a dense income grid.
+# Columns are (regime, metric); deductions (per regime name) come off the income before tax
+def sensitivity_curves(tables, deductions=None, max_income=SENSITIVITY_MAX_INCOME, step=SENSITIVITY_STEP,
+                       cache=sensitivity_cache):
+    deductions = deductions or {}
+    key = (regime_set_key(tables, deductions), max_income, step)
+    curves = cache.get(key)
+    if curves is not None:
+        return curves
+
+    income = income_grid(max_income, step)
+    columns = {}
+    for name, table in tables.items():
+        taxable = income - float(deductions.get(name, 0))
+        tax = table.tax(taxable)
+        columns[name, 'Tax'] = tax
+        with np.errstate(invalid='ignore', divide='ignore'):
+            columns[name, 'Effective Rate (%)'] = np.where(income > 0, tax / income * 100, 0.0)
+        columns[name, 'Marginal Rate (%)'] = table.marginal_rate(taxable) * 100
+    curves = pd.DataFrame(columns, index=pd.Index(income, name='Income'))
+    cache.put(key, curves)
+    return curves
+
+# Function to find the incomes where one regime overtakes another, from the full-resolution tax curves:
+# each row is the first income on the grid where the cheaper regime changes
+def crossovers(curves):
+    income = curves.index.to_numpy()
+    rows = []
+    for first, second in combinations(curves.columns.get_level_values(0).unique(), 2):
+        sign = np.sign(curves[first, 'Tax'].to_numpy() - curves[second, 'Tax'].to_numpy())
+        # Ties (e.g. both regimes at zero tax) keep whichever regime was cheaper before them
+        decided = np.flatnonzero(sign)
+        flips = decided[1:][sign[decided[1:]] != sign[decided[:-1]]]
+        for i in flips:
+            cheaper, dearer = (first, second) if sign[i] < 0 else (second, first)
+            rows.append({'Income': float(income[i]), 'Cheaper Above': cheaper, 'Cheaper Below': dearer})
+    return pd.DataFrame(rows, columns=['Income', 'Cheaper Above', 'Cheaper Below'])
+
+# Function to build one regime's curve as a downsampled line trace, drawn with WebGL when large
+def curve_trace(income, values, name, max_points=MAX_POINTS):
+    income, values = downsample_xy(income, values, max_points)
+    trace = go.Scattergl if len(values) > WEBGL_THRESHOLD else go.Scatter
+    return trace(x=income, y=values, mode='lines', name=name)
+
+# Function to build one downsampled line chart per metric, with a trace per regime
+def sensitivity_figures(tables, deductions=None, max_income=SENSITIVITY_MAX_INCOME, step=SENSITIVITY_STEP,
+                        max_points=MAX_POINTS, cache=sensitivity_cache):
+    key = (regime_set_key(tables, deductions or {}), max_income, step, max_points)
+    figures = cache.get(key + ('figures',))
+    if figures is not None:
+        return figures
+
+    curves = sensitivity_curves(tables, deductions, max_income, step, cache)
+    figures = {}
+    for metric, title in SENSITIVITY_METRICS.items():
+        fig = go.Figure()
+        for name in tables:
+            fig.add_trace(curve_trace(curves.index, curves[name, metric], name, max_points))
+        fig.update_layout(title=f'{title} by Income', xaxis_title='Income (₹)', yaxis_title=title)
+        figures[metric] = fig
+    cache.put(key + ('figures',), figures)
+    return figures
+
+# Function to get the sensitivity charts as Plotly JSON (serialized once per regime set) with the crossovers
+def sensitivity_graphs(tables, deductions=None, max_income=SENSITIVITY_MAX_INCOME, step=SENSITIVITY_STEP,
+                       max_points=MAX_POINTS, cache=sensitivity_cache):
+    key = (regime_set_key(tables, deductions or {}), max_income, step, max_points)
+    graphs = cache.get(key + ('json',))
+    if graphs is None:
+        figures = sensitivity_figures(tables, deductions, max_income, step, max_points, cache)
+        curves = sensitivity_curves(tables, deductions, max_income, step, cache)
+        graphs = {'graphs': [pio.to_json(fig) for fig in figures.values()],
+                  'crossovers': crossovers(curves).to_dict(orient='records')}
+        cache.put(key + ('json',), graphs)
+    return graphs
+
+# Function to answer a /sensitivity request from its query arguments: regimes (comma-separated, defaulting to
+# the calculator's own), std_deduction and nps_contribution for every regime, old_deductions for the old regime only
+def sensitivity_request(args, default_tables):
+    names = args.get('regimes')
+    tables = {name: regime_table(name) for name in names.split(',')} if names else default_tables
+    deduction = float(args.get('std_deduction', 50000)) + float(args.get('nps_contribution', 50000))
+    old_deductions = float(args.get('old_deductions', 0))
+    deductions = {name: deduction + (old_deductions if name == 'old' else 0) for name in tables}
+    return sensitivity_graphs(tables, deductions, float(args.get('max_income', SENSITIVITY_MAX_INCOME)),
+                              float(args.get('step', SENSITIVITY_STEP)))
@@ -0,0 +1,55 @@
+import io
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import newtaxcal
+import taxcal
+from payroll import PAYROLL_CHUNK_ROWS
+
+ROWS = PAYROLL_CHUNK_ROWS * 2 + 2000
+
+def roster(fmt, rows=ROWS):
+    incomes = [500000 + i for i in range(rows)]
+    if fmt == 'csv':
+        return ('income\n' + '\n'.join(map(str, incomes)) + '\n').encode()
+    return ''.join(json.dumps({'income': income}) + '\n' for income in incomes).encode()
+
+def read_output(data, fmt):
+    if fmt == 'csv':
+        return pd.read_csv(io.BytesIO(data))
+    return pd.read_json(io.BytesIO(data), lines=True)
+
+@pytest.mark.parametrize('app', [taxcal.app, newtaxcal.app], ids=['taxcal', 'newtaxcal'])
+@pytest.mark.parametrize('fmt', ['csv', 'ndjson'])
+def test_multipart_upload_streams_every_chunk(app, fmt):
+    upload = {'file': (io.BytesIO(roster(fmt)), f'roster.{fmt}')}
+    response = app.test_client().post('/bulk', data=upload, content_type='multipart/form-data')
+    assert response.status_code == 200
+    result = read_output(response.data, fmt)
+    assert len(result) == ROWS
+    assert result['income'].tolist() == [500000 + i for i in range(ROWS)]
+    assert result['error'].isna().all()
+
+@pytest.mark.parametrize('fmt', ['csv', 'ndjson'])
+def test_raw_body_streams_every_chunk(fmt):
+    response = taxcal.app.test_client().post(f'/bulk?format={fmt}', data=roster(fmt))
+    assert response.status_code == 200
+    assert len(read_output(response.data, fmt)) == ROWS
+
+def test_bad_chunk_ends_stream_with_error_record():
+    body = roster('ndjson', PAYROLL_CHUNK_ROWS) + b'{not json\n'
+    upload = {'file': (io.BytesIO(body), 'roster.ndjson')}
+    response = taxcal.app.test_client().post('/bulk', data=upload, content_type='multipart/form-data')
+    last = json.loads(response.data.splitlines()[-1])
+    assert last['error'].startswith(f'Payroll stopped after {PAYROLL_CHUNK_ROWS} rows')
+
+def test_empty_upload_is_rejected():
+    upload = {'file': (io.BytesIO(b''), 'roster.csv')}
+    response = taxcal.app.test_client().post('/bulk', data=upload, content_type='multipart/form-data')
+    assert response.status_code == 400
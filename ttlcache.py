@@ -0,0 +1,47 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Seconds an entry is kept when a cache is created without a ttl
+CACHE_TTL = 300
+# Entries a cache keeps before evicting the least recently used one
+CACHE_MAXSIZE = 256
+
+# Thread-safe cache of values that expire `ttl` seconds after they were stored. At most `maxsize`
+# entries are kept: expired ones are purged on put, then the least recently used ones are evicted
+class TTLCache:
+    def __init__(self, ttl=CACHE_TTL, maxsize=CACHE_MAXSIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, value):
+        with self.lock:
+            now = time.monotonic()
+            expired = [k for k, (expires, _) in self.entries.items() if expires < now]
+            for k in expired:
+                del self.entries[k]
+            self.entries[key] = (now + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)